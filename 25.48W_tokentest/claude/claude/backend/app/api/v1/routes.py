@@ -3,52 +3,138 @@ import json
 import io
 import csv
 import os
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Body
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Body, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Optional, Tuple
 from app.schemas import SummarizeRequest, SummarizeResponse
-from app.services.image_utils import preprocess_image_bytes
+from app.services.image_utils import (
+    IMAGE_ENCODER,
+    IMAGE_MAX_UPLOAD_BYTES,
+    ImageTooLarge,
+    preprocess_image_budget,
+    preprocess_image_bytes,
+    run_in_image_pool,
+    upload_size,
+)
 from app.services.providers.gpt5_provider import (
     build_pipeline_instruction,
     call_gpt5_summary,
+    require_api_key,
+    stream_gpt5_summary,
+    summary_request_key,
 )
+from app.core.single_flight import SingleFlight
+from app.core.memo_cache import MemoCache
 from app.core.token_utils import enforce_token_limit, token_count
-from app.services.embedding import get_query_embedding
+from app.services.embedding import (
+    get_query_embeddings,
+    EMBED_BATCH_WAIT_MS,
+    EmbeddingMicroBatcher,
+    default_embedding_cache,
+    get_query_embedding,
+)
 from app.services.hybrid import hybrid_merge
+from app.services.bm25 import BM25Index
+from app.services.vector_index import VectorIndex
+from app.services.doc_store import default_doc_store
 from app.core.summary_models import SUMMARY_MODELS, get_model_config, clamp_limit
-from app.core.summarizer import build_lexical_pipeline, build_vector_pipeline, make_shorten_fn
+from app.core.summarizer import (
+    build_lexical_pipeline,
+    build_vector_pipeline,
+    make_shorten_fn,
+)
 from app.eval import metrics_v04
-from app.eval.llm_v05 import summarize_lexical, summarize_vector
+from app.eval.llm_v05 import (
+    LLM_CONCURRENCY,
+    LLM_RPM,
+    LLM_TPM,
+    AIMDController,
+    RateLimiter,
+    summarize_batch_async,
+    summarize_lexical,
+    summarize_vector,
+)
 from app.eval.report_v04 import write_csv, write_md
-from app.eval.metrics_v04 import token_count_tiktoken, keyword_coverage
+from app.eval.metrics_v04 import token_count_batch, keyword_coverage
 import re
 
 router = APIRouter()
-_EMBED_CACHE = {}
+# 쿼리 임베딩 캐시 (메모리 LRU/TTL + 선택적 워커 간 SQLite 공유 계층)
+_EMBED_CACHE = default_embedding_cache()
+
+
+def _mock_embed(q: str):
+    # very naive embedding vector mock
+    return [float(len(q)), float(len(q) % 7)]
+
+
+def _mock_embed_batch(queries: List[str]):
+    return [_mock_embed(q) for q in queries]
+
+
+# EMBED_BATCH_WAIT_MS > 0 이면 동시 /search 요청의 임베딩을 모아서 한 번에 계산
+_EMBED_BATCHER = EmbeddingMicroBatcher(_mock_embed_batch, _EMBED_CACHE.get, _EMBED_CACHE.set)
+# 프로세스 내 모든 eval 요청이 공유하는 LLM 분당 요청/토큰 제한
+_LLM_LIMITER = RateLimiter(rpm=LLM_RPM, tpm=LLM_TPM)
+# 같은 client를 쓰는 eval 요청 전체의 동시 호출 수 (429면 줄이고 성공하면 다시 늘림)
+_LLM_CONTROLLER = AIMDController(initial=LLM_CONCURRENCY, max_limit=max(1, LLM_CONCURRENCY))
+# 같은 (model, instructions, text, image) /summarize 요청은 진행 중인 호출 하나를 공유
+_SUMMARY_FLIGHTS = SingleFlight()
+# 완료된 요약 응답 캐시 (키는 single-flight와 동일, TTL + 바이트 예산 LRU)
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", "3600"))
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+_SUMMARY_CACHE = MemoCache(max_bytes=SUMMARY_CACHE_MAX_BYTES, ttl=SUMMARY_CACHE_TTL or None)
 _DOCS = [
     {"id": "d1", "title": "Search demo document", "snippet": "Sample text about search and ranking."},
     {"id": "d2", "title": "Hybrid retrieval", "snippet": "Combining BM25 and vector results."},
     {"id": "d3", "title": "Embedding cache", "snippet": "Cache hits speed up query processing."},
 ]
+# 제목/스니펫 BM25 역색인 (모듈 로드 시 한 번 생성)
+_BM25_INDEX = BM25Index.build(_DOCS)
+# 문서 임베딩 인덱스 (쿼리와 같은 임베딩 함수 사용)
+_VECTOR_INDEX = VectorIndex.build(
+    [d["id"] for d in _DOCS], _mock_embed_batch([d["title"] + " " + d["snippet"] for d in _DOCS])
+)
+# 결과 제목/스니펫 조회용 mmap 컬럼 저장소 (워커 간 읽기 전용 공유, 첫 조회 때 매핑)
+_DOC_STORE = default_doc_store(_DOCS)
+# hybrid_merge에 넘길 leg별 후보 수
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "100"))
+# hybrid_merge fusion 방식 (weighted | rrf | minmax | zscore)
+SEARCH_FUSION = os.getenv("SEARCH_FUSION", "weighted")
+# /search/batch: 요청당 최대 쿼리 수 / 한 번에 임베딩·점수 계산하는 쿼리 수
+SEARCH_BATCH_MAX = int(os.getenv("SEARCH_BATCH_MAX", "10000"))
+SEARCH_BATCH_CHUNK = int(os.getenv("SEARCH_BATCH_CHUNK", "256"))
+# /search 응답 캐시 (키: 정규화 쿼리 + 모델 id + limit + fusion + 인덱스 버전)
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+_SEARCH_CACHE = MemoCache(max_bytes=SEARCH_CACHE_MAX_BYTES, ttl=SEARCH_CACHE_TTL or None)
+
+
+def _search_index_version() -> Tuple[int, int, str]:
+    """
+    BM25/벡터 인덱스 버전 + 문서 저장소 digest (응답의 제목/스니펫 출처).
+    어느 하나라도 바뀌면 키가 달라져 이전 캐시 항목은 더 이상 조회되지 않음 (LRU/TTL로 정리).
+    """
+    return _BM25_INDEX.version, _VECTOR_INDEX.version, _DOC_STORE.digest
+
+
+def _search_cache_key(query: str, lexical_model_id: str, vector_model_id: str, lexical_limit: int, vector_limit: int):
+    return (
+        "search",
+        query,
+        lexical_model_id,
+        vector_model_id,
+        lexical_limit,
+        vector_limit,
+        SEARCH_FUSION,
+        _search_index_version(),
+    )
 
 
 def _trim_to_limit(text: str, limit: int, style: str) -> str:
-    shorten = make_shorten_fn(style, style)
-    candidate = shorten(text, aggressive=False)
-    if token_count_tiktoken(candidate) > limit:
-        candidate = shorten(text, aggressive=True)
-    if token_count_tiktoken(candidate) > limit:
-        # sentence-wise fallback
-        sentences = [s.strip() for s in re.split(r"(?<=[.!?。！？])\s+|\n+", text) if s.strip()]
-        out = []
-        total = 0
-        for sent in sentences:
-            t = token_count_tiktoken(sent)
-            if total + t <= limit or not out:
-                out.append(sent)
-                total += t
-            else:
-                break
-        candidate = " ".join(out).strip() if out else candidate
-    return candidate
+    # 문장/토큰 인덱스에서 limit 이하 최장 구간을 한 번에 선택
+    return make_shorten_fn(style, style).to_limit(text, limit)
 
 
 def _clean_summary(text: str) -> str:
@@ -68,6 +154,74 @@ async def list_summary_models():
     return {"models": list(SUMMARY_MODELS.values())}
 
 
+@router.post("/search/batch")
+async def search_batch(payload: dict = Body(...)):
+    """
+    여러 쿼리를 한 요청으로 검색해 입력 순서대로 NDJSON 한 줄씩 스트리밍.
+
+    - SEARCH_BATCH_CHUNK개씩: 임베딩 한 번(get_query_embeddings), 벡터 점수 행렬곱 한 번,
+      BM25 search_batch 한 번, 쿼리마다 fusion 한 번
+    - 줄 형식: {"index", "query", "results"} / 빈 쿼리는 {"index", "query", "error"}
+    - include_debug=true면 /search와 같은 lexical/vector 파이프라인 결과를 debug로 포함 (기본 생략)
+    """
+    queries = payload.get("queries")
+    if not isinstance(queries, list) or not queries:
+        raise HTTPException(status_code=422, detail="queries must be a non-empty list")
+    if len(queries) > SEARCH_BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"at most {SEARCH_BATCH_MAX} queries per batch")
+
+    lexical_model_id = payload.get("lexical_model_id", "lexical_v1")
+    vector_model_id = payload.get("vector_model_id", "vector_v1")
+    try:
+        lexical_cfg = get_model_config(lexical_model_id)
+        vector_cfg = get_model_config(vector_model_id)
+        lexical_limit = clamp_limit(payload.get("lexical_limit"), lexical_cfg)
+        vector_limit = clamp_limit(payload.get("vector_limit"), vector_cfg)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    include_debug = payload.get("include_debug", False)
+    if not isinstance(include_debug, bool):
+        raise HTTPException(status_code=422, detail="include_debug must be a boolean")
+    bad = next((i for i, q in enumerate(queries) if not isinstance(q, str)), None)
+    if bad is not None:
+        raise HTTPException(status_code=422, detail=f"queries[{bad}] must be a string")
+    normalized = [" ".join(q.split()) for q in queries]
+
+    def run_chunk(start: int) -> List[str]:
+        chunk = normalized[start : start + SEARCH_BATCH_CHUNK]
+        live = [i for i, q in enumerate(chunk) if q]
+        safe = [enforce_token_limit(chunk[i], limit=50, shorten_fn=lambda t, a: t) for i in live]
+        vectors = get_query_embeddings(safe, _EMBED_CACHE.get, _EMBED_CACHE.set, _mock_embed_batch) if safe else []
+        vector_hits = _VECTOR_INDEX.search_batch(vectors, top_k=SEARCH_CANDIDATES)
+        bm25_hits = _BM25_INDEX.search_batch(safe, top_k=SEARCH_CANDIDATES)
+
+        lines: List[Optional[str]] = [None] * len(chunk)
+        for pos, i in enumerate(live):
+            merged = hybrid_merge(
+                bm25_hits[pos], vector_hits[pos], bm25_weight=0.5, vector_weight=0.5, top_k=10, method=SEARCH_FUSION
+            )
+            line = {"index": start + i, "query": chunk[i], "results": _search_results(merged)}
+            if include_debug:
+                line["debug"] = {
+                    "input": {"text": chunk[i], "tokens": token_count(chunk[i])},
+                    "lexical": build_lexical_pipeline(chunk[i], lexical_cfg, lexical_limit),
+                    "vector": build_vector_pipeline(chunk[i], vector_cfg, vector_limit),
+                }
+            lines[i] = json.dumps(line, ensure_ascii=False) + "\n"
+        for i, q in enumerate(chunk):
+            if lines[i] is None:
+                lines[i] = json.dumps({"index": start + i, "query": q, "error": "query is required"}) + "\n"
+        return lines
+
+    async def stream():
+        for start in range(0, len(normalized), SEARCH_BATCH_CHUNK):
+            # 청크 계산(CPU)은 스레드풀에서 → 다른 요청을 막지 않음
+            for line in await run_in_threadpool(run_chunk, start):
+                yield line
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.post("/eval/preview")
 async def eval_preview(payload: dict = Body(...)):
     samples = payload.get("samples")
@@ -99,31 +253,49 @@ async def eval_preview(payload: dict = Body(...)):
         # LLM 키 없으면 heuristic으로 폴백해 프롬프트 노출 방지
         mode = "heuristic"
 
-    rows = []
+    items = []
     for item in data:
         if not isinstance(item, dict):
             raise HTTPException(status_code=422, detail="each sample must be an object")
         if "content_summary" not in item:
             raise HTTPException(status_code=422, detail="content_summary is required in each sample")
-        text = item.get("content_summary", "")
+        items.append((item, item.get("content_summary", "")))
+
+    if mode == "llm":
+        # 샘플 전체의 lexical/vector 호출을 동시 실행 (동기 요약 함수는 스레드에서)
+        retries = payload.get("retries", 2)
+        raw_pairs = await summarize_batch_async(
+            [text for _, text in items],
+            lexical_limit,
+            vector_limit,
+            # 재시도까지 분당 한도에 포함되도록 limiter는 요약 호출에 직접 넘김
+            lexical_call=lambda t: summarize_lexical(
+                text=t,
+                limit=lexical_limit,
+                model=lexical_cfg["id"],
+                retries=retries,
+                controller=_LLM_CONTROLLER,
+                limiter=_LLM_LIMITER,
+            ),
+            vector_call=lambda t: summarize_vector(
+                text=t,
+                limit=vector_limit,
+                model=vector_cfg["id"],
+                retries=retries,
+                controller=_LLM_CONTROLLER,
+                limiter=_LLM_LIMITER,
+            ),
+        )
+
+    pending = []
+    for i, (item, text) in enumerate(items):
         if mode == "llm":
             lex_shorten = make_shorten_fn(lexical_cfg["id"], lexical_cfg.get("kind", "lexical"))
             vec_shorten = make_shorten_fn(vector_cfg["id"], vector_cfg.get("kind", "vector"))
-            lexical_raw = summarize_lexical(
-                text=text,
-                limit=lexical_limit,
-                model=lexical_cfg["id"],
-                retries=payload.get("retries", 2),
-            )
+            lexical_raw, vector_raw = raw_pairs[i]
             lexical_summary = _clean_summary(lexical_raw)
             lexical_summary = enforce_token_limit(lexical_summary, lexical_limit, lex_shorten)
             lexical_summary = _trim_to_limit(lexical_summary, lexical_limit, "lexical")
-            vector_raw = summarize_vector(
-                text=text,
-                limit=vector_limit,
-                model=vector_cfg["id"],
-                retries=payload.get("retries", 2),
-            )
             vector_summary = _clean_summary(vector_raw)
             vector_summary = enforce_token_limit(vector_summary, vector_limit, vec_shorten)
             vector_summary = _trim_to_limit(vector_summary, vector_limit, "vector")
@@ -132,14 +304,22 @@ async def eval_preview(payload: dict = Body(...)):
             vector_pipeline = build_vector_pipeline(text, vector_cfg, vector_limit)
             lexical_summary = lexical_pipeline["final_summary"]
             vector_summary = vector_pipeline["final_summary"]
+        pending.append((item, text, lexical_summary, vector_summary))
+
+    # 토큰 수는 샘플 전체를 모아 한 번에 계산
+    counts = metrics_v04.token_count_batch(
+        [t for _, text, lex, vec in pending for t in (text, lex, vec)]
+    )
+    rows = []
+    for i, (item, text, lexical_summary, vector_summary) in enumerate(pending):
         rows.append(
             {
                 "content_id": item.get("content_id", ""),
                 "title": item.get("title", ""),
                 "orig_text": text,
-                "orig_tokens": metrics_v04.token_count_tiktoken(text),
-                "lexical_tokens": metrics_v04.token_count_tiktoken(lexical_summary),
-                "vector_tokens": metrics_v04.token_count_tiktoken(vector_summary),
+                "orig_tokens": counts[3 * i],
+                "lexical_tokens": counts[3 * i + 1],
+                "vector_tokens": counts[3 * i + 2],
                 "keyword_cov": metrics_v04.keyword_coverage(text, lexical_summary),
                 "lexical_summary": lexical_summary,
                 "vector_summary": vector_summary,
@@ -157,18 +337,13 @@ async def eval_preview(payload: dict = Body(...)):
         "rows": rows,
     }
 
-@router.post("/summarize", response_model=SummarizeResponse)
-async def summarize(
-    provider: str = Form("gpt5"),
-    model: str = Form("gpt-5-mini"),
-    system_prompt: str = Form(None),
-    output_mode: str = Form("내용 요약"),
-    text: str = Form(None),
-    image: UploadFile = File(None),
-):
-    print("=== summarize 호출 ===")
-    print("provider:", provider, "/ model:", model)
-    print("output_mode:", output_mode, "/ system_prompt:", system_prompt)
+async def _prepare_summarize_inputs(
+    text: Optional[str],
+    image: Optional[UploadFile],
+    system_prompt: Optional[str],
+    output_mode: str,
+) -> Tuple[Optional[str], Optional[bytes], str, str]:
+    """/summarize 공통 입력 처리: (정리된 텍스트, 전처리 이미지, 이미지 MIME, 최종 instructions)."""
     cleaned_text = text.strip() if text and text.strip() else None
     print("text length:", len(cleaned_text) if cleaned_text else 0)
 
@@ -176,15 +351,27 @@ async def summarize(
         raise HTTPException(status_code=422, detail="text or image is required")
 
     processed_image = None
+    image_mime = "image/jpeg"
     if image is not None:
         try:
-            contents = await image.read()
-            size = len(contents)
+            # 업로드는 이미 임시 파일로 spool되어 있으므로 통째로 read()하지 않고 크기만 확인
+            size = image.size if image.size is not None else upload_size(image.file)
             print("image filename:", image.filename, "size:", size)
+            if size > IMAGE_MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="image too large")
+            image.file.seek(0)
             # 선택: 간단 전처리(예외 처리)
             try:
-                processed_image = preprocess_image_bytes(contents)
+                # 디코드/리사이즈는 이미지 풀에서 (다른 요청의 이벤트 루프를 막지 않음)
+                if IMAGE_ENCODER == "budget":
+                    processed_image, params = await run_in_image_pool(preprocess_image_budget, image.file)
+                    image_mime = params["mime"]
+                    print("image encoding:", params)
+                else:
+                    processed_image = await run_in_image_pool(preprocess_image_bytes, image.file)
                 print("processed image size:", len(processed_image))
+            except ImageTooLarge as e:
+                raise HTTPException(status_code=413, detail="image too large") from e
             except Exception as e:
                 print("image preprocessing 실패:", e)
                 raise HTTPException(status_code=422, detail="image preprocessing failed") from e
@@ -199,13 +386,45 @@ async def summarize(
     instruction_text = build_pipeline_instruction(output_mode)
     if system_prompt:
         instruction_text = system_prompt + "\n" + instruction_text
+    return cleaned_text, processed_image, image_mime, instruction_text
+
+
+@router.post("/summarize", response_model=SummarizeResponse)
+async def summarize(
+    response: Response,
+    provider: str = Form("gpt5"),
+    model: str = Form("gpt-5-mini"),
+    system_prompt: str = Form(None),
+    output_mode: str = Form("내용 요약"),
+    text: str = Form(None),
+    image: UploadFile = File(None),
+    cache_control: Optional[str] = Header(None),
+):
+    print("=== summarize 호출 ===")
+    print("provider:", provider, "/ model:", model)
+    print("output_mode:", output_mode, "/ system_prompt:", system_prompt)
+    cleaned_text, processed_image, image_mime, instruction_text = await _prepare_summarize_inputs(
+        text, image, system_prompt, output_mode
+    )
 
+    key = summary_request_key(model, instruction_text, cleaned_text, processed_image)
+    cache_mode = _request_cache_mode(cache_control)
+    if cache_mode == "default":
+        cached = _SUMMARY_CACHE.get(key)
+        if cached is not None:
+            response.headers["X-Summary-Cache"] = "hit"
+            return {"summary": cached, "provider": provider, "model": model}
+    response.headers["X-Summary-Cache"] = "miss" if cache_mode == "default" else cache_mode
     try:
-        summary_text = await call_gpt5_summary(
-            text=cleaned_text,
-            image_bytes=processed_image,
-            instructions=instruction_text,
-            model=model,
+        summary_text = await _SUMMARY_FLIGHTS.do(
+            key,
+            lambda: call_gpt5_summary(
+                text=cleaned_text,
+                image_bytes=processed_image,
+                instructions=instruction_text,
+                model=model,
+                image_mime=image_mime,
+            ),
         )
     except RuntimeError as e:
         raise HTTPException(status_code=422, detail=str(e)) from e
@@ -215,12 +434,125 @@ async def summarize(
     except Exception as e:
         print("gpt-5-mini 호출 실패:", e)
         raise HTTPException(status_code=422, detail=str(e)) from e
+    if cache_mode != "bypass" and isinstance(summary_text, str):
+        _SUMMARY_CACHE.set(key, summary_text, size=len(summary_text.encode("utf-8")))
     return {"summary": summary_text, "provider": provider, "model": model}
 
 
+def _request_cache_mode(cache_control: Optional[str]) -> str:
+    """
+    요청 Cache-Control 헤더 → 캐시 동작.
+    - no-store: bypass (조회/저장 모두 안 함)
+    - no-cache / max-age=0: refresh (조회는 건너뛰고 새 결과로 덮어씀)
+    - 그 외: default
+    """
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+    if "no-store" in directives:
+        return "bypass"
+    if "no-cache" in directives or "max-age=0" in directives:
+        return "refresh"
+    return "default"
+
+
+@router.get("/summarize/cache-stats")
+async def summarize_cache_stats():
+    return {"cache": _SUMMARY_CACHE.stats(), "single_flight": _SUMMARY_FLIGHTS.stats()}
+
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/summarize/stream")
+async def summarize_stream(
+    provider: str = Form("gpt5"),
+    model: str = Form("gpt-5-mini"),
+    system_prompt: str = Form(None),
+    output_mode: str = Form("내용 요약"),
+    text: str = Form(None),
+    image: UploadFile = File(None),
+):
+    """
+    /summarize의 SSE 스트리밍 버전.
+
+    - event: token  data: {"delta": "..."}  (모델 토큰이 도착하는 대로)
+    - event: done   data: {"summary", "provider", "model"}  (마지막 chunk)
+    - event: error  data: {"detail": "..."}  (스트리밍 시작 후 실패)
+    입력 검증/이미지 전처리/provider 설정(API 키) 실패는 스트림 시작 전에 4xx로 응답한다.
+    """
+    print("=== summarize(stream) 호출 ===")
+    print("provider:", provider, "/ model:", model)
+    cleaned_text, processed_image, image_mime, instruction_text = await _prepare_summarize_inputs(
+        text, image, system_prompt, output_mode
+    )
+    try:
+        require_api_key()
+    except RuntimeError as e:
+        # /summarize와 같은 422 (200 응답 뒤 error 이벤트가 아니라)
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+    async def events():
+        parts: List[str] = []
+        try:
+            async for delta in stream_gpt5_summary(
+                text=cleaned_text,
+                image_bytes=processed_image,
+                instructions=instruction_text,
+                model=model,
+                image_mime=image_mime,
+            ):
+                parts.append(delta)
+                yield _sse("token", {"delta": delta})
+        except httpx.HTTPStatusError as e:
+            print("gpt-5-mini 스트리밍 HTTP 오류:", e.response.status_code)
+            yield _sse("error", {"detail": "model call failed (http error)"})
+            return
+        except Exception as e:
+            print("gpt-5-mini 스트리밍 실패:", e)
+            yield _sse("error", {"detail": str(e)})
+            return
+        yield _sse("done", {"summary": "".join(parts), "provider": provider, "model": model})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/search/stats")
+async def search_stats():
+    return {
+        "embedding_cache": _EMBED_CACHE.stats(),
+        "embedding_batcher": _EMBED_BATCHER.stats(),
+        "result_cache": _SEARCH_CACHE.stats(),
+        "index_version": list(_search_index_version()),
+    }
+
+
+def _search_results(merged: List[Dict]) -> List[Dict]:
+    results = []
+    for item in merged:
+        doc = _DOC_STORE.get(item["id"]) or {}
+        results.append(
+            {
+                "id": item["id"],
+                "score": item["score"],
+                "title": doc.get("title", ""),
+                "snippet": doc.get("snippet", ""),
+            }
+        )
+    return results
+
+
 @router.post("/search")
-async def search(payload: dict = Body(...)):
-    query = (payload.get("query") or "").strip()
+async def search(
+    response: Response,
+    payload: dict = Body(...),
+    cache_control: Optional[str] = Header(None),
+):
+    # 공백 정규화한 쿼리로 파이프라인/검색/캐시 키를 모두 계산 (응답이 키의 함수가 되도록)
+    query = " ".join((payload.get("query") or "").split())
     if not query:
         raise HTTPException(status_code=422, detail="query is required")
 
@@ -238,47 +570,34 @@ async def search(payload: dict = Body(...)):
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e)) from e
 
+    key = _search_cache_key(query, lexical_model_id, vector_model_id, lexical_limit, vector_limit)
+    cache_mode = _request_cache_mode(cache_control)
+    if cache_mode == "default":
+        cached = _SEARCH_CACHE.get(key)
+        if cached is not None:
+            response.headers["X-Search-Cache"] = "hit"
+            return cached
+    response.headers["X-Search-Cache"] = "miss" if cache_mode == "default" else cache_mode
+
     lexical_pipeline = build_lexical_pipeline(query, lexical_cfg, lexical_limit)
     vector_pipeline = build_vector_pipeline(query, vector_cfg, vector_limit)
 
     safe_query = enforce_token_limit(query, limit=50, shorten_fn=lambda t, a: t)
 
-    def cache_get(key: str):
-        return _EMBED_CACHE.get(key)
-
-    def cache_set(key: str, value):
-        _EMBED_CACHE[key] = value
-
-    def embed_fn(q: str):
-        # very naive embedding vector mock
-        return [float(len(q)), float(len(q) % 7)]
+    if EMBED_BATCH_WAIT_MS > 0:
+        query_vec = await _EMBED_BATCHER.embed(safe_query)
+    else:
+        query_vec = get_query_embedding(safe_query, _EMBED_CACHE.get, _EMBED_CACHE.set, _mock_embed)
 
-    _ = get_query_embedding(safe_query, cache_get, cache_set, embed_fn)
+    bm25_results = _BM25_INDEX.search(safe_query, top_k=SEARCH_CANDIDATES)
 
-    # Mock BM25/vector scores from static docs
-    bm25_results = []
-    tokens = safe_query.lower().split()
-    for doc in _DOCS:
-        hay = (doc["title"] + " " + doc["snippet"]).lower()
-        score = float(sum(hay.count(tok) for tok in tokens))
-        bm25_results.append({"id": doc["id"], "score": score})
+    vector_results = _VECTOR_INDEX.search(query_vec, top_k=SEARCH_CANDIDATES)
 
-    vector_results = [{"id": doc["id"], "score": float(1.0 / (idx + 1))} for idx, doc in enumerate(_DOCS)]
+    merged = hybrid_merge(
+        bm25_results, vector_results, bm25_weight=0.5, vector_weight=0.5, top_k=10, method=SEARCH_FUSION
+    )
 
-    merged = hybrid_merge(bm25_results, vector_results, bm25_weight=0.5, vector_weight=0.5, top_k=10)
-
-    doc_lookup = {d["id"]: d for d in _DOCS}
-    results = []
-    for item in merged:
-        doc = doc_lookup.get(item["id"], {})
-        results.append(
-            {
-                "id": item["id"],
-                "score": item["score"],
-                "title": doc.get("title", ""),
-                "snippet": doc.get("snippet", ""),
-            }
-        )
+    results = _search_results(merged)
 
     debug = {
         "input": {"text": query, "tokens": token_count(query)},
@@ -286,7 +605,10 @@ async def search(payload: dict = Body(...)):
         "vector": vector_pipeline,
     }
 
-    return {"results": results, "debug": debug}
+    body = {"results": results, "debug": debug}
+    if cache_mode != "bypass":
+        _SEARCH_CACHE.set(key, body, size=len(json.dumps(body, ensure_ascii=False).encode("utf-8")))
+    return body
 
 
 @router.post("/eval/preview")
@@ -330,12 +652,14 @@ async def eval_preview(payload: dict = Body(...)):
                 limit=lexical_limit,
                 model=lexical_cfg["id"],
                 retries=payload.get("retries", 2),
+                controller=_LLM_CONTROLLER,
             )
             vector_summary = summarize_vector(
                 text=text,
                 limit=vector_limit,
                 model=vector_cfg["id"],
                 retries=payload.get("retries", 2),
+                controller=_LLM_CONTROLLER,
             )
         else:
             lexical_pipeline = build_lexical_pipeline(text, lexical_cfg, lexical_limit)
@@ -378,19 +702,34 @@ async def eval_download(payload: dict = Body(...)):
     if not isinstance(samples, list) or not samples:
         raise HTTPException(status_code=422, detail="samples must be non-empty list")
 
-    rows = []
+    items = []
     for item in samples:
         if not isinstance(item, dict):
             raise HTTPException(status_code=422, detail="each sample must be an object")
         text = (item.get("content_summary") or "").strip()
         if not text:
             continue
+        items.append((item, text))
+
+    if mode == "llm":
+        raw_pairs = await summarize_batch_async(
+            [text for _, text in items],
+            lexical_limit,
+            vector_limit,
+            lexical_call=lambda t: summarize_lexical(
+                t, lexical_limit, model="gpt-5-mini", controller=_LLM_CONTROLLER, limiter=_LLM_LIMITER
+            ),
+            vector_call=lambda t: summarize_vector(
+                t, vector_limit, model="gpt-5-mini", controller=_LLM_CONTROLLER, limiter=_LLM_LIMITER
+            ),
+        )
 
+    pending = []
+    for i, (item, text) in enumerate(items):
         if mode == "llm":
             lex_shorten = make_shorten_fn("lexical_v1", "lexical")
             vec_shorten = make_shorten_fn("vector_v1", "vector")
-            lex_raw = summarize_lexical(text, lexical_limit, model="gpt-5-mini")
-            vec_raw = summarize_vector(text, vector_limit, model="gpt-5-mini")
+            lex_raw, vec_raw = raw_pairs[i]
             lex_s = _clean_summary(lex_raw)
             vec_s = _clean_summary(vec_raw)
             lex_s = enforce_token_limit(lex_s, lexical_limit, lex_shorten)
@@ -402,9 +741,12 @@ async def eval_download(payload: dict = Body(...)):
             vec_pipe = build_vector_pipeline(text, SUMMARY_MODELS["vector_v1"], vector_limit)
             lex_s = lex_pipe["final_summary"]
             vec_s = vec_pipe["final_summary"]
+        pending.append((item, text, lex_s, vec_s))
 
-        lex_tok = token_count_tiktoken(lex_s)
-        vec_tok = token_count_tiktoken(vec_s)
+    counts = token_count_batch([t for _, text, lex_s, vec_s in pending for t in (text, lex_s, vec_s)])
+    rows = []
+    for i, (item, text, lex_s, vec_s) in enumerate(pending):
+        orig_tok, lex_tok, vec_tok = counts[3 * i : 3 * i + 3]
         cov = keyword_coverage(text, lex_s)
         flags = []
         if lex_s == "SUMMARY_FAIL" or vec_s == "SUMMARY_FAIL":
@@ -417,7 +759,7 @@ async def eval_download(payload: dict = Body(...)):
                 "content_id": item.get("content_id", ""),
                 "title": item.get("title", ""),
                 "orig_text": text,
-                "orig_tok": token_count_tiktoken(text),
+                "orig_tok": orig_tok,
                 "lex_tok": lex_tok,
                 "vec_tok": vec_tok,
                 "lex_cov": cov,
@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import hashlib
+import threading
+import time
+
+
+def content_key(namespace: str, text: str) -> Tuple[str, bytes]:
+    """Cache key for a text: (namespace, blake2b-128 digest of its UTF-8 bytes)."""
+    return namespace, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class MemoCache:
+    """
+    Thread-safe LRU cache bounded by an approximate byte budget.
+
+    - get(): returns the cached value (or default) and marks it recently used
+    - set(): stores value with a caller-supplied size estimate, evicting LRU entries
+    - ttl: optional seconds after set() when an entry expires (checked on get)
+    - stats(): hits/misses/evictions/expired/entries/bytes counters
+    - clear(): drops all entries and resets counters
+    """
+
+    # dict 엔트리 + 키 튜플 + digest 대략치
+    ENTRY_OVERHEAD = 120
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        # key -> (value, size, expires_at)
+        self._data: "OrderedDict[Hashable, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[2] is not None and self._clock() >= entry[2]:
+                del self._data[key]
+                self._bytes -= entry[1]
+                self.expired += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, size: int = 0) -> None:
+        size += self.ENTRY_OVERHEAD
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            # 예산보다 큰 값은 저장하지 않지만, 같은 키의 이전 값도 더 이상 돌려주지 않음
+            if size > self.max_bytes:
+                return
+            expires_at = self._clock() + self.ttl if self.ttl else None
+            self._data[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.expired = 0
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_ratio": (self.hits / lookups) if lookups else None,
+            }
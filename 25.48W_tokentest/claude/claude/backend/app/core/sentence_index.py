@@ -0,0 +1,94 @@
+from bisect import bisect_left, bisect_right
+from typing import Callable, List, Optional, Sequence
+import re
+
+from app.eval.metrics_v04 import token_count_tiktoken
+
+# 문장 경계: 종결부호 뒤 공백 또는 줄바꿈
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into stripped, non-empty sentences."""
+    if not text:
+        return []
+    return [s.strip() for s in SENTENCE_SPLIT_RE.split(text) if s.strip()]
+
+
+class SentenceTokenIndex:
+    """
+    Sentence-level token index: split and count once, then select runs by budget.
+
+    - sentences: stripped sentences in original order
+    - counts: per-sentence token counts
+    - prefix_sums: len(sentences) + 1 entries, prefix_sums[0] == 0
+
+    prefix()/suffix() return sub-indexes for the longest leading/trailing run
+    under a token budget (binary search, no re-encoding). At least one sentence
+    is always kept so a summary never collapses to an empty string.
+    """
+
+    def __init__(
+        self,
+        text: str = "",
+        counter_fn: Callable[[str], int] = token_count_tiktoken,
+        *,
+        sentences: Optional[Sequence[str]] = None,
+        counts: Optional[Sequence[int]] = None,
+    ):
+        if sentences is None:
+            sentences = split_sentences(text)
+        if counts is None:
+            counts = [counter_fn(s) for s in sentences]
+        self.sentences: List[str] = list(sentences)
+        self.counts: List[int] = list(counts)
+        self.prefix_sums: List[int] = [0]
+        for c in self.counts:
+            self.prefix_sums.append(self.prefix_sums[-1] + c)
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prefix_sums[-1]
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.sentences).strip()
+
+    def slice(self, start: int, stop: int) -> "SentenceTokenIndex":
+        return SentenceTokenIndex(
+            sentences=self.sentences[start:stop],
+            counts=self.counts[start:stop],
+        )
+
+    def prefix_len(self, budget: int) -> int:
+        """Number of leading sentences whose token sum is <= budget (min 1)."""
+        n = len(self.sentences)
+        if n == 0:
+            return 0
+        k = bisect_right(self.prefix_sums, budget) - 1
+        return min(n, max(1, k))
+
+    def suffix_len(self, budget: int) -> int:
+        """Number of trailing sentences whose token sum is <= budget (min 1)."""
+        n = len(self.sentences)
+        if n == 0:
+            return 0
+        k = n - bisect_left(self.prefix_sums, self.total_tokens - budget)
+        return min(n, max(1, k))
+
+    def prefix(self, budget: int) -> "SentenceTokenIndex":
+        """Lexical selection: keep the front of the text."""
+        return self.slice(0, self.prefix_len(budget))
+
+    def suffix(self, budget: int) -> "SentenceTokenIndex":
+        """Vector selection: keep the back of the text."""
+        n = len(self.sentences)
+        return self.slice(n - self.suffix_len(budget), n)
+
+    def select(self, style: str, budget: int) -> "SentenceTokenIndex":
+        if style == "vector":
+            return self.suffix(budget)
+        return self.prefix(budget)
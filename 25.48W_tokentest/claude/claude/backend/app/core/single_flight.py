@@ -0,0 +1,50 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    In-flight request coalescing for async calls.
+
+    - do(key, fn): the first caller for a key starts fn() as a task; callers
+      arriving while it runs await the same task and share its result/exception
+    - the shared call is shielded, so a cancelled waiter (client disconnect)
+      never cancels the upstream call for the others
+    - stats(): leaders (upstream calls) / shared (coalesced callers) / in_flight
+    Keys are forgotten as soon as the call finishes (no result caching).
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task"] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.leaders += 1
+
+            def forget(done: "asyncio.Task", key: Hashable = key) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            task.add_done_callback(forget)
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        calls = self.leaders + self.shared
+        return {
+            "leaders": self.leaders,
+            "shared": self.shared,
+            "in_flight": len(self._inflight),
+            "shared_ratio": (self.shared / calls) if calls else None,
+        }
@@ -1,53 +1,66 @@
 from typing import Callable, Dict, List, Tuple
 from app.core.token_utils import token_count
-from app.eval.metrics_v04 import token_count_tiktoken
-import re
+from app.core.sentence_index import SentenceTokenIndex
+from app.eval.metrics_v04 import token_count_tiktoken, within_token_limit
+
+
+def select_by_ratio(index: SentenceTokenIndex, style: str, aggressive: bool) -> SentenceTokenIndex:
+    """Pick a sentence run at 85% (or 65% when aggressive) of the indexed token total."""
+    # limit 정보를 직접 받을 수 없으므로 비율로 축약하되 과도하게 줄이지 않음
+    ratio = 0.85 if not aggressive else 0.65
+    target_tokens = int(max(1, index.total_tokens * ratio))
+    # lexical은 앞쪽, vector는 뒤쪽 의미 중심으로 선택
+    return index.select(style, target_tokens)
 
 
 def make_shorten_fn(model_id: str, style: str):
     """
     Factory for shorten functions by model/style.
     This is a deterministic placeholder that trims tokens and can be mocked in tests.
+
+    - shorten(text, aggressive): legacy ratio pass (85% / 65% of the text's tokens)
+    - shorten.to_limit(text, limit, counter_fn): limit-aware single pass, picks
+      the longest sentence run under `limit` measured by counter_fn (default
+      tiktoken). For tiktoken units, text already within the limit by
+      token_bounds() is returned as-is without building an index.
+
+    The last selected run is memoized per counter, so a follow-up pass on the
+    previous output reuses its sentence/token index instead of re-encoding.
     """
+    last: Dict[Tuple[Callable[[str], int], str], SentenceTokenIndex] = {}
 
-    def shorten(text: str, aggressive: bool) -> str:
+    def pick(
+        text: str,
+        select: Callable[[SentenceTokenIndex], SentenceTokenIndex],
+        counter_fn: Callable[[str], int] = token_count_tiktoken,
+    ) -> str:
         if not text:
             return ""
         # 문장 단위로 나누어 자연스러운 형태 유지
-        sentences = [s.strip() for s in re.split(r"(?<=[.!?。！？])\s+|\n+", text) if s.strip()]
-        if not sentences:
-            sentences = [text.strip()]
-
-        # limit 정보를 직접 받을 수 없으므로 비율로 축약하되 과도하게 줄이지 않음
-        ratio = 0.85 if not aggressive else 0.65
-        target_tokens = int(max(1, token_count_tiktoken(text) * ratio))
-
-        if style == "vector":
-            # 뒤쪽 의미 중심으로 선택
-            out: List[str] = []
-            total = 0
-            for sent in reversed(sentences):
-                sent_tokens = token_count_tiktoken(sent)
-                if total + sent_tokens <= target_tokens or not out:
-                    out.insert(0, sent)
-                    total += sent_tokens
-                else:
-                    break
-        else:
-            out = []
-            total = 0
-            for sent in sentences:
-                sent_tokens = token_count_tiktoken(sent)
-                if total + sent_tokens <= target_tokens or not out:
-                    out.append(sent)
-                    total += sent_tokens
-                else:
-                    break
-
-        return " ".join(out).strip()
+        index = last.get((counter_fn, text)) or SentenceTokenIndex(text, counter_fn)
+        picked = select(index)
+        out = picked.text
+        last.clear()
+        last[(counter_fn, out)] = picked
+        return out
+
+    def shorten(text: str, aggressive: bool) -> str:
+        return pick(text, lambda index: select_by_ratio(index, style, aggressive))
+
+    def to_limit(text: str, limit: int, counter_fn: Callable[[str], int] = token_count_tiktoken) -> str:
+        # 경계값 판정은 tiktoken 단위일 때만 유효
+        if (
+            counter_fn is token_count_tiktoken
+            and text
+            and (counter_fn, text) not in last
+            and within_token_limit(text, limit)
+        ):
+            return text
+        return pick(text, lambda index: index.select(style, limit), counter_fn)
 
     shorten.model_id = model_id  # type: ignore[attr-defined]
     shorten.style = style  # type: ignore[attr-defined]
+    shorten.to_limit = to_limit  # type: ignore[attr-defined]
     return shorten
 
 
@@ -57,19 +70,31 @@ def summarize_with_steps(
     shorten_fn: Callable[[str, bool], str],
     counter_fn: Callable[[str], int] = token_count,
 ) -> Tuple[str, List[Dict]]:
+    """
+    Shorten text to the limit, recording {"summary", "tokens"} per step.
+
+    If shorten_fn exposes to_limit(text, limit, counter_fn), a single
+    limit-aware pass is used (budgeted in counter_fn's units); otherwise the
+    legacy non-aggressive → aggressive passes run.
+    """
     steps: List[Dict] = []
 
-    def add_step(current: str):
+    def add_step(current: str) -> int:
         steps.append({"summary": current, "tokens": counter_fn(current)})
+        return steps[-1]["tokens"]
 
     current = text
-    add_step(current)
-    if steps[-1]["tokens"] <= limit:
+    if add_step(current) <= limit:
+        return current, steps
+
+    to_limit = getattr(shorten_fn, "to_limit", None)
+    if to_limit is not None:
+        current = to_limit(current, limit, counter_fn)
+        add_step(current)
         return current, steps
 
     current = shorten_fn(current, False)
-    add_step(current)
-    if steps[-1]["tokens"] <= limit:
+    if add_step(current) <= limit:
         return current, steps
 
     current = shorten_fn(current, True)
@@ -82,7 +107,8 @@ def build_pipeline(text: str, model_cfg: Dict, limit: int) -> Dict:
     summary, steps = summarize_with_steps(text, limit=limit, shorten_fn=shorten)
     return {
         "final_summary": summary,
-        "final_tokens": token_count(summary),
+        # 마지막 step이 이미 summary를 같은 단위로 셌으므로 다시 세지 않음
+        "final_tokens": steps[-1]["tokens"],
         "steps": steps,
         "model_id": model_cfg["id"],
         "limit": limit,
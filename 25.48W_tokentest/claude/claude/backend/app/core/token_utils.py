@@ -17,6 +17,8 @@ def enforce_token_limit(
 
     Flow:
     - If counter_fn(text) <= limit: return text.
+    - If shorten_fn exposes to_limit(text, limit, counter_fn): one limit-aware
+      pass budgeted in counter_fn's units, return it.
     - Else: shorten_fn(text, aggressive=False) once.
     - Re-count; if still > limit: shorten_fn(result, aggressive=True).
     - Return the final text (even if still over, to avoid infinite loops).
@@ -28,6 +30,10 @@ def enforce_token_limit(
     if counter_fn(current) <= limit:
         return current
 
+    to_limit = getattr(shorten_fn, "to_limit", None)
+    if to_limit is not None:
+        return to_limit(current, limit, counter_fn)
+
     current = shorten_fn(current, False)
     if counter_fn(current) <= limit:
         return current
@@ -0,0 +1,209 @@
+"""
+Persistent content-addressed cache for LLM summary calls (ver05).
+
+- LLMResponseCache: SQLite 파일 캐시 (TTL, 바이트 예산 LRU 축출, 적중 통계)
+- cached_client(): client(prompt, model) 호출을 감싸는 투명 래퍼 (동기/async 모두 지원)
+
+키 = sha256(client_id, model, prompt). 프롬프트에는 text/limit/style이 모두 들어가므로
+메트릭만 바뀐 재실행은 API 호출 없이 캐시에서 끝난다.
+"""
+
+from typing import Callable, Dict, Optional
+import hashlib
+import inspect
+import os
+import sqlite3
+import threading
+import time
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+
+
+def client_identity(client: Callable) -> str:
+    """
+    client 식별자: 명시 속성 client_id 우선, 없으면 module.qualname.
+
+    lambda/지역 함수는 qualname이 서로 겹칠 수 있어(다른 client와 캐시 항목 공유)
+    client_id를 명시해야 한다.
+    """
+    explicit = getattr(client, "client_id", None)
+    if explicit:
+        return str(explicit)
+    module = getattr(client, "__module__", "") or ""
+    name = getattr(client, "__qualname__", None) or type(client).__qualname__
+    if "<lambda>" in name or "<locals>" in name:
+        raise ValueError(f"client_id is required for {name!r} (lambda or local function)")
+    return f"{module}.{name}"
+
+
+def cache_key(prompt: str, model: str, client_id: str) -> str:
+    h = hashlib.sha256()
+    for part in (client_id, model, prompt):
+        data = part.encode("utf-8")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache.
+
+    - ttl: 초 단위 유효기간 (0이면 만료 없음)
+    - max_bytes: 응답 바이트 합계 상한, 넘으면 last_access가 오래된 순으로 축출
+    - stats(): hits/misses/expired/evictions/entries/bytes
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = LLM_CACHE_TTL,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " client_id TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_access ON llm_cache(last_access)")
+        # 응답 바이트 합계는 메모리에서 관리 (set마다 SUM 하지 않도록)
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._delete(key)
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return response
+
+    def set(self, key: str, response: str, model: str = "", client_id: str = "") -> None:
+        if not isinstance(response, str):
+            return
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = self._clock()
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, client_id, response, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, client_id, response, size, now, now),
+            )
+            self._bytes += size
+            self._evict()
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._bytes -= row[0]
+
+    def _evict(self) -> None:
+        # 오래 안 쓴 순으로 조금씩 읽어 예산 아래로 내려갈 때까지 삭제
+        while self._bytes > self.max_bytes:
+            victims = self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access LIMIT 64").fetchall()
+            if not victims:
+                self._bytes = 0
+                return
+            for key, size in victims:
+                if self._bytes <= self.max_bytes:
+                    return
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._bytes -= size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._bytes = 0
+            self.hits = self.misses = self.expired = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": self._bytes,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def cached_client(
+    client: Callable,
+    cache: Optional[LLMResponseCache],
+    client_id: Optional[str] = None,
+    bypass: bool = LLM_CACHE_BYPASS,
+) -> Callable:
+    """
+    client(prompt, model)를 캐시로 감싼다. 시그니처/동기·async 여부는 그대로 유지.
+
+    - 성공한 응답만 저장 (예외는 그대로 전파되어 재시도 로직이 처리)
+    - cache가 None이거나 bypass=True면 원래 client를 그대로 반환
+    - lambda/지역 함수 client는 client_id를 명시해야 함 (없으면 ValueError)
+    """
+    if cache is None or bypass:
+        return client
+    cid = client_id or client_identity(client)
+
+    if inspect.iscoroutinefunction(client):
+        async def async_wrapper(prompt: str, model: str) -> str:
+            key = cache_key(prompt, model, cid)
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+            result = await client(prompt, model)
+            cache.set(key, result, model=model, client_id=cid)
+            return result
+
+        async_wrapper.client_id = cid  # type: ignore[attr-defined]
+        return async_wrapper
+
+    def wrapper(prompt: str, model: str) -> str:
+        key = cache_key(prompt, model, cid)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+        result = client(prompt, model)
+        cache.set(key, result, model=model, client_id=cid)
+        return result
+
+    wrapper.client_id = cid  # type: ignore[attr-defined]
+    return wrapper
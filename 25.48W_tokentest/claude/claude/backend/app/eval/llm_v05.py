@@ -1,27 +1,210 @@
-from typing import Callable, Tuple
+from collections import deque
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple, Union
+import asyncio
+import email.utils
+import inspect
+import os
+import random
+import threading
+import time
+
 from app.eval.metrics_v04 import token_count_tiktoken
 
+# 동시 LLM 호출 상한 / 분당 요청·토큰 제한 기본값 (0이면 제한 없음)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+LLM_RPM = int(os.getenv("LLM_RPM", "0"))
+LLM_TPM = int(os.getenv("LLM_TPM", "0"))
+
+# 재시도 백오프: base * 2^(n-1) 상한 max, full jitter, Retry-After 우선
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+
+# 테스트에서 교체할 수 있도록 모듈 단위로 보관
+_sleep = time.sleep
+_async_sleep = asyncio.sleep
+
+SummaryCall = Callable[[str], Union[str, Awaitable[str]]]
+
 
 class LLMClientNotConfigured(Exception):
     pass
 
 
+class LLMRateLimited(Exception):
+    """client가 429/스로틀링을 알릴 때 던지는 예외. retry_after는 초 단위(선택)."""
+
+    def __init__(self, message: str = "rate limited", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value) -> Optional[float]:
+    """Retry-After 헤더 값(초 또는 HTTP-date)을 초 단위로 변환."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def classify_error(e: Exception) -> Tuple[bool, Optional[float]]:
+    """
+    예외를 (rate_limited, retry_after)로 분류.
+
+    - LLMRateLimited, status 429, 이름에 RateLimit이 들어간 예외(openai.RateLimitError 등) → rate limited
+    - retry_after: 예외 속성 또는 response.headers의 Retry-After
+    """
+    if isinstance(e, LLMRateLimited):
+        return True, e.retry_after
+    response = getattr(e, "response", None)
+    status = getattr(e, "status_code", None) or getattr(response, "status_code", None)
+    retry_after = _parse_retry_after(getattr(e, "retry_after", None))
+    headers = getattr(response, "headers", None)
+    if retry_after is None and headers:
+        retry_after = _parse_retry_after(headers.get("retry-after") or headers.get("Retry-After"))
+    rate_limited = status == 429 or "ratelimit" in type(e).__name__.lower()
+    return rate_limited, retry_after
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: Optional[float] = None,
+    base_delay: Optional[float] = None,
+    max_delay: Optional[float] = None,
+) -> float:
+    """
+    attempt(1부터) 실패 후 대기 시간: full jitter 지수 백오프, Retry-After가 있으면 그 이상.
+    어떤 경우에도 max_delay(LLM_RETRY_MAX_DELAY)를 넘지 않음 (Retry-After: 86400 같은 값에 슬롯을 하루 동안 잡지 않도록).
+    """
+    base = LLM_RETRY_BASE_DELAY if base_delay is None else base_delay
+    ceiling = LLM_RETRY_MAX_DELAY if max_delay is None else max_delay
+    delay = random.uniform(0, min(ceiling, base * (2 ** (attempt - 1))))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return min(delay, ceiling)
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class AIMDController:
+    """
+    같은 client를 공유하는 호출자들의 동시성 조절기 (AIMD).
+
+    - 성공: limit += increase / limit (대략 한 라운드에 +increase)
+    - 스로틀: limit *= decrease (cooldown 안의 연속 429는 한 번만 반영)
+    - acquire()/acquire_async()로 슬롯을 얻고 release()로 반납
+    스레드(동기 client)와 asyncio 호출자 모두 같은 인스턴스를 쓸 수 있다.
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._clock = clock
+        self._limit = float(min(max_limit, max(min_limit, initial)))
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self._in_flight < self.limit:
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    async def acquire_async(self) -> None:
+        """슬롯이 날 때까지 대기. 스레드/다른 루프의 release()도 call_soon_threadsafe로 깨운다."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self._cond:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+
+    def _wake(self) -> None:
+        # self._cond를 잡은 상태에서 호출
+        self._cond.notify_all()
+        waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, waiter)
+            except RuntimeError:
+                pass  # 이미 닫힌 루프
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._wake()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+            self._wake()
+
+    def on_throttle(self) -> None:
+        with self._cond:
+            now = self._clock()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._limit = max(self.min_limit, self._limit * self.decrease)
+
+
 def _default_client(prompt: str, model: str) -> str:
     # Deterministic stub: just echo prompt (used in offline mode)
     return prompt
 
 
-def _summarize_with_retry(
-    text: str,
-    limit: int,
-    model: str,
-    style: str,
-    retries: int,
-    client: Callable[[str, str], str],
-    fallback: str,
-    return_meta: bool,
-) -> Tuple[str, dict]:
-    prompt = (
+# 외부에서 감싸 쓸 수 있도록 기본 client 공개 (예: llm_cache_v05.cached_client)
+default_client = _default_client
+
+
+def _build_prompt(text: str, limit: int, style: str) -> str:
+    return (
         "너는 한국어 요약기다. 아래 규칙을 반드시 지켜서 1문단 요약을 생성한다.\n"
         "규칙:\n"
         "- 최종 토큰 수는 반드시 limit 이하가 되도록 문장 단위로 재작성한다.\n"
@@ -33,15 +216,77 @@ def _summarize_with_retry(
         f"[SUMMARY]\n"
         f"{text}"
     )
-    meta = {"attempts": 0, "last_error": None}
-    for _ in range(max(1, retries)):
+
+
+def _record_attempt(meta: dict, attempt: int, started: float, error: Optional[Exception]) -> Tuple[bool, Optional[float]]:
+    """시도별 소요 시간/오류를 meta에 기록하고 (rate_limited, retry_after) 반환."""
+    rate_limited, retry_after = classify_error(error) if error is not None else (False, None)
+    meta["attempt_timings"].append(
+        {
+            "attempt": attempt,
+            "elapsed": time.monotonic() - started,
+            "error": str(error) if error is not None else None,
+            "rate_limited": rate_limited,
+            "backoff": 0.0,
+        }
+    )
+    if error is not None:
+        meta["last_error"] = str(error)
+        if rate_limited:
+            meta["rate_limited"] += 1
+    return rate_limited, retry_after
+
+
+def _summarize_with_retry(
+    text: str,
+    limit: int,
+    model: str,
+    style: str,
+    retries: int,
+    client: Callable[[str, str], str],
+    fallback: str,
+    return_meta: bool,
+    controller: Optional[AIMDController] = None,
+    limiter: Optional["RateLimiter"] = None,
+) -> Tuple[str, dict]:
+    """
+    client 호출 + 재시도. 실패 후에는 지수 백오프(jitter, Retry-After 존중)로 대기한다.
+    controller가 있으면 슬롯을 얻어 호출하고 성공/스로틀 결과를 AIMD에 반영한다.
+    limiter가 있으면 재시도를 포함한 매 시도 전에 분당 요청/토큰 한도를 확보한다.
+    meta: attempts, last_error, rate_limited(횟수), attempt_timings(시도별 elapsed/backoff)
+    """
+    prompt = _build_prompt(text, limit, style)
+    meta = {"attempts": 0, "last_error": None, "rate_limited": 0, "attempt_timings": []}
+    attempts = max(1, retries)
+    call_tokens = estimate_call_tokens(text, limit) if limiter is not None else 0
+    for attempt in range(1, attempts + 1):
         meta["attempts"] += 1
+        # 재시도도 분당 요청/토큰 예산에 포함 (슬롯을 잡기 전에 대기)
+        if limiter is not None:
+            limiter.acquire_blocking(call_tokens)
+        if controller is not None:
+            controller.acquire()
+        started = time.monotonic()
         try:
-            result = client(prompt, model)
-            return (result, meta) if return_meta else result
+            try:
+                result = client(prompt, model)
+            finally:
+                # 취소(CancelledError 등 BaseException)에도 슬롯은 반드시 반납
+                if controller is not None:
+                    controller.release()
         except Exception as e:
-            meta["last_error"] = str(e)
+            rate_limited, retry_after = _record_attempt(meta, attempt, started, e)
+            if controller is not None and rate_limited:
+                controller.on_throttle()
+            if attempt < attempts:
+                delay = backoff_delay(attempt, retry_after)
+                meta["attempt_timings"][-1]["backoff"] = delay
+                _sleep(delay)
             continue
+        _record_attempt(meta, attempt, started, None)
+        if controller is not None:
+            controller.on_success()
+        return (result, meta) if return_meta else result
     return (fallback, meta) if return_meta else fallback
 
 
@@ -53,6 +298,8 @@ def summarize_lexical(
     client: Callable[[str, str], str] = None,
     fallback: str = "SUMMARY_FAIL",
     return_meta: bool = False,
+    controller: Optional[AIMDController] = None,
+    limiter: Optional["RateLimiter"] = None,
 ):
     client = client or _default_client
     summary = _summarize_with_retry(
@@ -64,6 +311,8 @@ def summarize_lexical(
         client=client,
         fallback=fallback,
         return_meta=return_meta,
+        controller=controller,
+        limiter=limiter,
     )
     return summary
 
@@ -76,6 +325,8 @@ def summarize_vector(
     client: Callable[[str, str], str] = None,
     fallback: str = "SUMMARY_FAIL",
     return_meta: bool = False,
+    controller: Optional[AIMDController] = None,
+    limiter: Optional["RateLimiter"] = None,
 ):
     client = client or _default_client
     summary = _summarize_with_retry(
@@ -87,5 +338,255 @@ def summarize_vector(
         client=client,
         fallback=fallback,
         return_meta=return_meta,
+        controller=controller,
+        limiter=limiter,
     )
     return summary
+
+
+async def _call_maybe_async(fn: Callable, *args):
+    """async 함수는 await, 동기 함수는 스레드로 넘겨 이벤트 루프를 막지 않는다."""
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args)
+    result = await asyncio.to_thread(fn, *args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _summarize_with_retry_async(
+    text: str,
+    limit: int,
+    model: str,
+    style: str,
+    retries: int,
+    client: Callable,
+    fallback: str,
+    return_meta: bool,
+    controller: Optional[AIMDController] = None,
+    limiter: Optional["RateLimiter"] = None,
+):
+    """_summarize_with_retry()의 async 버전 (백오프는 asyncio.sleep)."""
+    prompt = _build_prompt(text, limit, style)
+    meta = {"attempts": 0, "last_error": None, "rate_limited": 0, "attempt_timings": []}
+    attempts = max(1, retries)
+    call_tokens = estimate_call_tokens(text, limit) if limiter is not None else 0
+    for attempt in range(1, attempts + 1):
+        meta["attempts"] += 1
+        # 재시도도 분당 요청/토큰 예산에 포함 (슬롯을 잡기 전에 대기)
+        if limiter is not None:
+            await limiter.acquire(call_tokens)
+        if controller is not None:
+            await controller.acquire_async()
+        started = time.monotonic()
+        try:
+            try:
+                result = await _call_maybe_async(client, prompt, model)
+            finally:
+                # 취소(CancelledError 등 BaseException)에도 슬롯은 반드시 반납
+                if controller is not None:
+                    controller.release()
+        except Exception as e:
+            rate_limited, retry_after = _record_attempt(meta, attempt, started, e)
+            if controller is not None and rate_limited:
+                controller.on_throttle()
+            if attempt < attempts:
+                delay = backoff_delay(attempt, retry_after)
+                meta["attempt_timings"][-1]["backoff"] = delay
+                await _async_sleep(delay)
+            continue
+        _record_attempt(meta, attempt, started, None)
+        if controller is not None:
+            controller.on_success()
+        return (result, meta) if return_meta else result
+    return (fallback, meta) if return_meta else fallback
+
+
+async def summarize_lexical_async(
+    text: str,
+    limit: int,
+    model: str,
+    retries: int = 3,
+    client: Callable = None,
+    fallback: str = "SUMMARY_FAIL",
+    return_meta: bool = False,
+    controller: Optional[AIMDController] = None,
+    limiter: Optional["RateLimiter"] = None,
+):
+    """summarize_lexical()의 async 버전. client는 동기/async 모두 허용."""
+    return await _summarize_with_retry_async(
+        text=text,
+        limit=limit,
+        model=model,
+        style="lexical",
+        retries=retries,
+        client=client or _default_client,
+        fallback=fallback,
+        return_meta=return_meta,
+        controller=controller,
+        limiter=limiter,
+    )
+
+
+async def summarize_vector_async(
+    text: str,
+    limit: int,
+    model: str,
+    retries: int = 3,
+    client: Callable = None,
+    fallback: str = "SUMMARY_FAIL",
+    return_meta: bool = False,
+    controller: Optional[AIMDController] = None,
+    limiter: Optional["RateLimiter"] = None,
+):
+    """summarize_vector()의 async 버전. client는 동기/async 모두 허용."""
+    return await _summarize_with_retry_async(
+        text=text,
+        limit=limit,
+        model=model,
+        style="vector",
+        retries=retries,
+        client=client or _default_client,
+        fallback=fallback,
+        return_meta=return_meta,
+        controller=controller,
+        limiter=limiter,
+    )
+
+
+class RateLimiter:
+    """
+    60초 슬라이딩 윈도우 기반 요청/토큰 제한.
+
+    - rpm: 분당 최대 요청 수 (0/None이면 제한 없음)
+    - tpm: 분당 최대 토큰 수 (0/None이면 제한 없음)
+    - acquire(tokens): 여유가 생길 때까지 (asyncio) 대기 후 사용량 기록
+    - acquire_blocking(tokens): 스레드에서 쓰는 동기 버전
+    확인과 기록은 락 안에서 한 번에 하므로 이벤트 루프와 워커 스레드가 같은 limiter를 공유해도 된다.
+    """
+
+    WINDOW = 60.0
+
+    def __init__(
+        self,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        clock=time.monotonic,
+        sleep=asyncio.sleep,
+        sync_sleep=time.sleep,
+    ):
+        self.rpm = rpm or 0
+        self.tpm = tpm or 0
+        self._clock = clock
+        self._sleep = sleep
+        self._sync_sleep = sync_sleep
+        self._lock = threading.Lock()
+        self._events: deque = deque()
+        self._tokens = 0
+
+    def _prune(self, now: float) -> None:
+        while self._events and now - self._events[0][0] >= self.WINDOW:
+            _, used = self._events.popleft()
+            self._tokens -= used
+
+    def _reserve(self, tokens: int) -> float:
+        """여유가 있으면 사용량을 기록하고 0, 없으면 기다릴 초."""
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            rpm_ok = not self.rpm or len(self._events) < self.rpm
+            # 단일 요청이 tpm보다 커도 윈도우가 비었으면 통과시켜 교착을 막는다
+            tpm_ok = not self.tpm or not self._events or self._tokens + tokens <= self.tpm
+            if rpm_ok and tpm_ok:
+                self._events.append((now, tokens))
+                self._tokens += tokens
+                return 0.0
+            return max(0.01, self.WINDOW - (now - self._events[0][0]))
+
+    async def acquire(self, tokens: int = 0) -> None:
+        if not self.rpm and not self.tpm:
+            return
+        while True:
+            wait = self._reserve(tokens)
+            if not wait:
+                return
+            await self._sleep(wait)
+
+    def acquire_blocking(self, tokens: int = 0) -> None:
+        if not self.rpm and not self.tpm:
+            return
+        while True:
+            wait = self._reserve(tokens)
+            if not wait:
+                return
+            self._sync_sleep(wait)
+
+
+def estimate_call_tokens(text: str, limit: int) -> int:
+    """분당 토큰 제한용 추정치: 입력 토큰 + 출력 limit + 프롬프트 규칙 오버헤드."""
+    return token_count_tiktoken(text) + limit + 200
+
+
+async def summarize_batch_async(
+    texts: Sequence[str],
+    lexical_limit: int,
+    vector_limit: int,
+    model: str = "gpt-5-mini",
+    *,
+    retries: int = 3,
+    client: Callable = None,
+    fallback: str = "SUMMARY_FAIL",
+    concurrency: Optional[int] = None,
+    limiter: Optional[RateLimiter] = None,
+    lexical_call: Optional[SummaryCall] = None,
+    vector_call: Optional[SummaryCall] = None,
+    controller: Optional[AIMDController] = None,
+) -> List[Tuple[str, str]]:
+    """
+    여러 샘플의 lexical/vector 요약을 동시에 실행하고 입력 순서대로 (lexical, vector) 반환.
+
+    - concurrency: 동시에 진행되는 LLM 호출 수 상한 (기본 LLM_CONCURRENCY)
+    - limiter: 요청/토큰 분당 제한 (기본: LLM_RPM/LLM_TPM 설정 시 생성).
+      기본 호출에는 재시도를 포함한 매 시도마다 적용
+    - lexical_call/vector_call: text → 요약 (동기면 스레드에서 실행).
+      기본은 summarize_lexical_async/summarize_vector_async(client, retries, fallback).
+      직접 넘긴 호출은 재시도를 볼 수 없으므로, limiter를 명시했을 때만 호출당 한 번 확보한다
+      (재시도까지 세려면 limiter를 summarize_lexical(limiter=...)에 넘기고 여기엔 넘기지 말 것).
+    - controller: 기본 호출에 넘기는 AIMD 동시성 조절기 (스로틀 시 동시 호출 수를 줄임)
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency or LLM_CONCURRENCY))
+    call_limiter = limiter
+    if limiter is None:
+        limiter = RateLimiter(rpm=LLM_RPM, tpm=LLM_TPM)
+
+    # 호출 단위 limiter (직접 넘긴 호출 + limiter 명시일 때만)
+    lexical_limiter = call_limiter
+    vector_limiter = call_limiter
+
+    if lexical_call is None:
+        lexical_limiter = None
+
+        async def lexical_call(t: str) -> str:
+            return await summarize_lexical_async(
+                t, lexical_limit, model, retries, client, fallback, controller=controller, limiter=limiter
+            )
+
+    if vector_call is None:
+        vector_limiter = None
+
+        async def vector_call(t: str) -> str:
+            return await summarize_vector_async(
+                t, vector_limit, model, retries, client, fallback, controller=controller, limiter=limiter
+            )
+
+    async def run(call: SummaryCall, text: str, limit: int, per_call: Optional[RateLimiter]) -> str:
+        async with semaphore:
+            if per_call is not None:
+                await per_call.acquire(estimate_call_tokens(text, limit))
+            return await _call_maybe_async(call, text)
+
+    lexical = [run(lexical_call, t, lexical_limit, lexical_limiter) for t in texts]
+    vector = [run(vector_call, t, vector_limit, vector_limiter) for t in texts]
+    results = await asyncio.gather(*lexical, *vector)
+    n = len(texts)
+    return list(zip(results[:n], results[n:]))
@@ -1,33 +1,152 @@
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, TextIO
 import json
 from pathlib import Path
 
+REQUIRED_FIELDS = {"content_id", "title", "content_summary"}
 
-def load_content_summaries(path: str) -> List[Dict]:
+# 스트리밍 파서가 한 번에 읽는 문자 수 (큰 항목이면 두 배씩 늘림)
+READ_CHUNK_CHARS = 1 << 16
+
+JSONL_SUFFIXES = {".jsonl", ".ndjson"}
+
+
+def _validate(idx: int, item) -> Dict:
+    if not isinstance(item, dict):
+        raise ValueError(f"item at index {idx} is not an object")
+    missing = REQUIRED_FIELDS - item.keys()
+    if missing:
+        raise ValueError(f"missing fields {missing} at index {idx}")
+    return item
+
+
+# 잘린 \uXXXX 이스케이프 등 끝 근처에서 나는 오류를 포함하기 위한 여유
+TRUNCATION_MARGIN = 8
+
+
+def _truncated(e: json.JSONDecodeError, buf_len: int) -> bool:
+    """decode 오류가 버퍼 끝에서 항목이 잘려 생긴 것인지 판정."""
+    # 닫히지 않은 문자열은 시작 위치를 가리키므로 메시지로 판별
+    return e.pos >= buf_len - TRUNCATION_MARGIN or e.msg.startswith("Unterminated string")
+
+
+def _iter_json_array(f: TextIO, chunk_chars: int = READ_CHUNK_CHARS) -> Iterator:
     """
-    Load content_summary_100_samples.json and validate minimal schema.
+    Yield elements of a top-level JSON array one by one.
 
-    Expected fields:
-      - content_id
-      - title
-      - content_summary
+    Uses JSONDecoder.raw_decode on a sliding buffer, so only the current
+    element (plus one read chunk) is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    read_size = chunk_chars
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = f.read(read_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_ws() -> Optional[str]:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return None
+
+    if skip_ws() != "[":
+        raise ValueError("JSON root must be a list")
+    pos += 1
+
+    first = True
+    idx = 0
+    while True:
+        ch = skip_ws()
+        if ch is None:
+            raise ValueError("unexpected end of JSON array")
+        if ch == "]":
+            pos += 1
+            break
+        if not first:
+            if ch != ",":
+                raise ValueError(f"expected ',' or ']' at offset {pos}")
+            pos += 1
+            if skip_ws() is None:
+                raise ValueError("unexpected end of JSON array")
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                # 버퍼 끝에서 잘린 항목만 더 읽고 재시도, 중간의 오류는 바로 보고
+                if _truncated(e, len(buf)):
+                    read_size *= 2
+                    if fill():
+                        continue
+                raise ValueError(f"invalid JSON at index {idx}: {e.msg}") from e
+            if end == len(buf) and fill():
+                # 숫자 등은 경계에서 잘릴 수 있으므로 뒤를 더 본 뒤 다시 해석
+                continue
+            break
+        read_size = chunk_chars
+        pos = end
+        first = False
+        idx += 1
+        yield value
+
+    if skip_ws() is not None:
+        raise ValueError("extra data after JSON array")
+
+
+def _iter_jsonl(f: TextIO) -> Iterator:
+    for lineno, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON at line {lineno}: {e.msg}") from e
+
+
+def iter_content_summaries(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Stream content_summary samples and validate each item as it is read.
+
+    - fmt: "json" (top-level array) or "jsonl" (one object per line);
+      inferred from the suffix (.jsonl/.ndjson → jsonl) when omitted
+    - same schema checks and index-based errors as load_content_summaries()
     """
     p = Path(path)
     if not p.exists():
         raise ValueError(f"file not found: {path}")
+    if fmt is None:
+        fmt = "jsonl" if p.suffix.lower() in JSONL_SUFFIXES else "json"
 
     with p.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+        items = _iter_jsonl(f) if fmt == "jsonl" else _iter_json_array(f)
+        for idx, item in enumerate(items):
+            yield _validate(idx, item)
 
-    if not isinstance(data, list):
-        raise ValueError("JSON root must be a list")
 
-    required = {"content_id", "title", "content_summary"}
-    for idx, item in enumerate(data):
-        if not isinstance(item, dict):
-            raise ValueError(f"item at index {idx} is not an object")
-        missing = required - item.keys()
-        if missing:
-            raise ValueError(f"missing fields {missing} at index {idx}")
+def load_content_summaries(path: str) -> List[Dict]:
+    """
+    Load content_summary_100_samples.json and validate minimal schema.
 
-    return data
+    Expected fields:
+      - content_id
+      - title
+      - content_summary
+
+    Large exports should use iter_content_summaries() instead.
+    """
+    return list(iter_content_summaries(path))
@@ -1,14 +1,26 @@
-from typing import Set
+from typing import FrozenSet, List, Optional, Sequence, Set, Tuple
 from functools import lru_cache
+import os
 import re
+import unicodedata
+
+from app.core.memo_cache import MemoCache, content_key
+
+# token_bounds()는 o200k_base 프리토크나이저 규칙 기준이라 실제 tiktoken일 때만 사용
+TOKEN_BOUNDS_ENABLED = True
 
 try:
     import tiktoken
 except ImportError:  # fallback for environments without tiktoken installed
+    TOKEN_BOUNDS_ENABLED = False
+
     class _DummyEncoding:
         def encode(self, text: str):
             return (text or "").split()
 
+        def encode_batch(self, texts, num_threads: int = 8):
+            return [self.encode(t) for t in texts]
+
     class tiktoken:  # type: ignore
         @staticmethod
         def get_encoding(name: str):
@@ -20,17 +32,116 @@ def _get_encoding():
     return tiktoken.get_encoding("o200k_base")
 
 
+# 프로세스 전역 메모 캐시: 내용 해시 → 토큰 수 / 키워드 셋 (LRU, 바이트 예산)
+METRICS_CACHE = MemoCache(max_bytes=int(os.getenv("METRICS_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+
+
+def clear_metrics_cache() -> None:
+    """토큰 수/키워드 메모 캐시 비우기 (카운터 포함)."""
+    METRICS_CACHE.clear()
+
+
 def token_count_tiktoken(text: str) -> int:
     """
     tiktoken(o200k_base) 기반 토큰 카운트.
 
     - None/빈 문자열 → 0
-    - 일반 문자열 → enc.encode() 길이 반환
+    - 일반 문자열 → enc.encode() 길이 반환 (METRICS_CACHE에 메모)
     """
-    enc = _get_encoding()
     if not text:
         return 0
-    return len(enc.encode(text))
+    key = content_key("tok", text)
+    cached = METRICS_CACHE.get(key)
+    if cached is not None:
+        return cached
+    count = len(_get_encoding().encode(text))
+    METRICS_CACHE.set(key, count)
+    return count
+
+
+# encode_batch 스레드 수 (tiktoken 내부 ThreadPoolExecutor)
+TOKEN_COUNT_THREADS = int(os.getenv("TOKEN_COUNT_THREADS", "8"))
+
+
+def token_count_batch(texts: Sequence[str], num_threads: Optional[int] = None) -> List[int]:
+    """
+    여러 문자열의 토큰 수를 한 번에 계산.
+
+    - enc.encode_batch()로 스레드 풀에서 병렬 인코딩 (num_threads 미지정 시 TOKEN_COUNT_THREADS)
+    - None/빈 문자열 → 0, 입력 순서 유지
+    - METRICS_CACHE 히트는 건너뛰고 미스만 인코딩
+    """
+    texts = list(texts)
+    counts = [0] * len(texts)
+    pending = []
+    for i, t in enumerate(texts):
+        if not t:
+            continue
+        key = content_key("tok", t)
+        cached = METRICS_CACHE.get(key)
+        if cached is not None:
+            counts[i] = cached
+        else:
+            pending.append((i, key))
+    if not pending:
+        return counts
+    encoded = _get_encoding().encode_batch(
+        [texts[i] for i, _ in pending],
+        num_threads=num_threads or TOKEN_COUNT_THREADS,
+    )
+    for (i, key), tokens in zip(pending, encoded):
+        counts[i] = len(tokens)
+        METRICS_CACHE.set(key, counts[i])
+    return counts
+
+
+_DIGIT_RUN_RE = re.compile(r"\d+")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+
+
+def token_bounds(text: str) -> Tuple[int, int]:
+    """
+    o200k_base 토큰 수의 저렴한 (하한, 상한). 인코딩 없이 문자 클래스만 본다.
+
+    - 상한: UTF-8 바이트 수 (바이트 단위 BPE라 토큰은 최소 1바이트)
+    - 하한: 공백 단위 덩어리마다 프리토크나이저 조각 수
+      (문자/한글 조각 1 + 숫자 3자리 묶음 + 끝 구두점 1, 최소 1)
+    """
+    if not text:
+        return 0, 0
+    upper = len(text.encode("utf-8"))
+    lower = 0
+    for run in text.split():
+        pieces = sum((len(m) + 2) // 3 for m in _DIGIT_RUN_RE.findall(run))
+        if _LETTER_RE.search(run):
+            pieces += 1
+            last = run[-1]
+            if not last.isalnum() and not unicodedata.category(last).startswith("M"):
+                pieces += 1
+        lower += max(1, pieces)
+    return lower, upper
+
+
+def token_count_bounded(text: str, limit: int) -> Tuple[int, int]:
+    """
+    limit 판정용 카운트: (하한, 상한) 반환.
+
+    - token_bounds()로 limit 대비 확실히 작거나 크면 인코딩 없이 반환
+    - 하한 <= limit < 상한 인 애매한 구간에서만 정확히 인코딩해 (n, n) 반환
+    """
+    if not text:
+        return 0, 0
+    if TOKEN_BOUNDS_ENABLED:
+        lower, upper = token_bounds(text)
+        if upper <= limit or lower > limit:
+            return lower, upper
+    count = token_count_tiktoken(text)
+    return count, count
+
+
+def within_token_limit(text: str, limit: int) -> bool:
+    """token_count_tiktoken(text) <= limit 을 경계값으로 먼저 판정."""
+    return token_count_bounded(text, limit)[1] <= limit
 
 
 def _normalize_token(tok: str) -> str:
@@ -43,6 +154,22 @@ def _normalize_token(tok: str) -> str:
     return tok
 
 
+def _keywords(text: str) -> FrozenSet[str]:
+    """extract_keywords() 본체. METRICS_CACHE에 frozenset으로 메모."""
+    key = content_key("kw", text)
+    cached = METRICS_CACHE.get(key)
+    if cached is not None:
+        return cached
+    kws = set()
+    for raw in text.split():
+        norm = _normalize_token(raw)
+        if norm:
+            kws.add(norm)
+    frozen = frozenset(kws)
+    METRICS_CACHE.set(key, frozen, size=sum(len(k.encode("utf-8")) + 60 for k in frozen))
+    return frozen
+
+
 def extract_keywords(text: str) -> Set[str]:
     """
     키워드 셋 추출:
@@ -52,12 +179,7 @@ def extract_keywords(text: str) -> Set[str]:
     """
     if not text:
         return set()
-    kws = set()
-    for raw in text.split():
-        norm = _normalize_token(raw)
-        if norm:
-            kws.add(norm)
-    return kws
+    return set(_keywords(text))
 
 
 def keyword_coverage(orig: str, lexical: str) -> float:
@@ -65,9 +187,9 @@ def keyword_coverage(orig: str, lexical: str) -> float:
     coverage = |KW_orig ∩ KW_lex| / |KW_orig|
     - 원문 키워드가 0개면 0.0 반환
     """
-    orig_kws = extract_keywords(orig)
+    orig_kws = _keywords(orig) if orig else frozenset()
     if not orig_kws:
         return 0.0
-    lex_kws = extract_keywords(lexical)
+    lex_kws = _keywords(lexical) if lexical else frozenset()
     inter = orig_kws & lex_kws
     return len(inter) / len(orig_kws)
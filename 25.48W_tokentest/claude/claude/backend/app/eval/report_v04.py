@@ -1,6 +1,8 @@
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
 import csv
+import os
+import tempfile
 
 
 @dataclass
@@ -13,66 +15,135 @@ class EvalRow:
     keyword_cov: float
 
 
-def build_rows(samples: List[Dict], metrics) -> List[EvalRow]:
+# 토큰 카운트를 모아서 한 번에 계산할 샘플 수
+BATCH_SIZE = 256
+
+
+def iter_batches(items: Iterable, size: int = BATCH_SIZE) -> Iterator[List]:
+    """Yield lists of up to `size` items without materializing the input."""
+    batch: List = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def count_tokens(metrics, texts: List[str]) -> List[int]:
+    """Batch count via metrics.token_count_batch, falling back to per-text calls."""
+    batch_fn = getattr(metrics, "token_count_batch", None)
+    if batch_fn is not None:
+        return batch_fn(texts)
+    return [metrics.token_count_tiktoken(t) for t in texts]
+
+
+def iter_rows(samples: Iterable[Dict], metrics, batch_size: int = BATCH_SIZE) -> Iterator[EvalRow]:
     """
     Core evaluation loop: per-document 요약/토큰/커버리지 계산.
-    samples: load_content_summaries() 결과.
+    samples: load_content_summaries()/iter_content_summaries() 결과.
     metrics: token_count_tiktoken, keyword_coverage 등을 갖는 모듈/객체.
+    토큰 수는 batch_size 단위로 모아서 한 번에 계산하고, 행은 배치마다 바로 내보낸다.
     """
-    rows: List[EvalRow] = []
-    for item in samples:
-        cid = item["content_id"]
-        title = item.get("title", "")
-        orig = item.get("content_summary", "")
-        lex = item.get("lexical_summary", "")
-        vec = item.get("vector_summary", "")
-        rows.append(
-            EvalRow(
-                content_id=cid,
-                title=title,
-                orig_tokens=metrics.token_count_tiktoken(orig),
-                lexical_tokens=metrics.token_count_tiktoken(lex),
-                vector_tokens=metrics.token_count_tiktoken(vec),
+    for batch in iter_batches(samples, batch_size):
+        texts: List[str] = []
+        for item in batch:
+            texts.append(item.get("content_summary", ""))
+            texts.append(item.get("lexical_summary", ""))
+            texts.append(item.get("vector_summary", ""))
+        counts = count_tokens(metrics, texts)
+        for i, item in enumerate(batch):
+            orig, lex, _ = texts[3 * i : 3 * i + 3]
+            yield EvalRow(
+                content_id=item["content_id"],
+                title=item.get("title", ""),
+                orig_tokens=counts[3 * i],
+                lexical_tokens=counts[3 * i + 1],
+                vector_tokens=counts[3 * i + 2],
                 keyword_cov=metrics.keyword_coverage(orig, lex),
             )
-        )
-    return rows
 
 
-def write_csv(rows: List[EvalRow], path: str) -> None:
+def build_rows(samples: Iterable[Dict], metrics, batch_size: int = BATCH_SIZE) -> List[EvalRow]:
+    """iter_rows() 결과를 리스트로 모은다."""
+    return list(iter_rows(samples, metrics, batch_size))
+
+
+CSV_FIELDS = [
+    "content_id",
+    "title",
+    "orig_tokens",
+    "lexical_tokens",
+    "vector_tokens",
+    "keyword_cov",
+]
+MD_HEADER = "| content_id | title | orig_tokens | lexical_tokens | vector_tokens | keyword_cov |\n"
+MD_SEP = "|------------|-------|-------------|----------------|----------------|-------------|\n"
+
+
+def _csv_row(r: EvalRow) -> Dict:
+    return {
+        "content_id": r.content_id,
+        "title": r.title,
+        "orig_tokens": r.orig_tokens,
+        "lexical_tokens": r.lexical_tokens,
+        "vector_tokens": r.vector_tokens,
+        "keyword_cov": r.keyword_cov,
+    }
+
+
+def _md_line(r: EvalRow) -> str:
+    return f"| {r.content_id} | {r.title} | {r.orig_tokens} | {r.lexical_tokens} | {r.vector_tokens} | {r.keyword_cov} |\n"
+
+
+def write_csv(rows: Iterable[EvalRow], path: str) -> None:
     """Write per-document results to CSV."""
-    fieldnames = [
-        "content_id",
-        "title",
-        "orig_tokens",
-        "lexical_tokens",
-        "vector_tokens",
-        "keyword_cov",
-    ]
     with open(path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
         writer.writeheader()
         for r in rows:
-            writer.writerow(
-                {
-                    "content_id": r.content_id,
-                    "title": r.title,
-                    "orig_tokens": r.orig_tokens,
-                    "lexical_tokens": r.lexical_tokens,
-                    "vector_tokens": r.vector_tokens,
-                    "keyword_cov": r.keyword_cov,
-                }
-            )
+            writer.writerow(_csv_row(r))
 
 
-def write_md(rows: List[EvalRow], path: str) -> None:
+def write_md(rows: Iterable[EvalRow], path: str) -> None:
     """Aggregate stats and write Markdown summary."""
-    header = "| content_id | title | orig_tokens | lexical_tokens | vector_tokens | keyword_cov |\n"
-    sep = "|------------|-------|-------------|----------------|----------------|-------------|\n"
-    lines = [header, sep]
-    for r in rows:
-        lines.append(
-            f"| {r.content_id} | {r.title} | {r.orig_tokens} | {r.lexical_tokens} | {r.vector_tokens} | {r.keyword_cov} |\n"
-        )
     with open(path, "w", encoding="utf-8") as f:
-        f.writelines(lines)
+        f.writelines([MD_HEADER, MD_SEP])
+        for r in rows:
+            f.write(_md_line(r))
+
+
+def _temp_beside(path: str) -> str:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    os.close(fd)
+    return tmp
+
+
+def write_reports(rows: Iterable[EvalRow], csv_path: str, md_path: str) -> int:
+    """
+    Stream rows into the CSV and Markdown outputs in one pass.
+    Returns the number of rows written.
+
+    rows는 지연 생성(입력 파일을 읽으면서 검증)되므로 결과는 임시 파일에 쓰고
+    끝까지 성공했을 때만 os.replace로 교체한다. 잘못된 입력이면 기존 보고서는 그대로 남는다.
+    """
+    count = 0
+    csv_tmp = _temp_beside(csv_path)
+    md_tmp = _temp_beside(md_path)
+    try:
+        with open(csv_tmp, "w", encoding="utf-8", newline="") as f_csv, open(md_tmp, "w", encoding="utf-8") as f_md:
+            writer = csv.DictWriter(f_csv, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            f_md.writelines([MD_HEADER, MD_SEP])
+            for r in rows:
+                writer.writerow(_csv_row(r))
+                f_md.write(_md_line(r))
+                count += 1
+        os.replace(csv_tmp, csv_path)
+        os.replace(md_tmp, md_path)
+    finally:
+        for tmp in (csv_tmp, md_tmp):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return count
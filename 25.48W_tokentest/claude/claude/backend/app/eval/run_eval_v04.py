@@ -10,22 +10,21 @@ Example:
 
 import argparse
 
-from app.eval.loader_v04 import load_content_summaries
-from app.eval.report_v04 import build_rows, write_csv, write_md
+from app.eval.loader_v04 import iter_content_summaries
+from app.eval.report_v04 import iter_rows, write_reports
 from app.eval import metrics_v04
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run ver04 batch evaluation")
-    parser.add_argument("--input", required=True, help="Path to content_summary JSON")
+    parser.add_argument("--input", required=True, help="Path to content_summary JSON/JSONL")
     parser.add_argument("--output-csv", required=True, help="Per-document CSV output")
     parser.add_argument("--output-md", required=True, help="Markdown summary output")
     args = parser.parse_args()
 
-    samples = load_content_summaries(args.input)
-    rows = build_rows(samples, metrics_v04)
-    write_csv(rows, args.output_csv)
-    write_md(rows, args.output_md)
+    # 입력을 스트리밍으로 읽고 행도 바로 기록 → 메모리 사용량이 입력 크기와 무관
+    samples = iter_content_summaries(args.input)
+    write_reports(iter_rows(samples, metrics_v04), args.output_csv, args.output_md)
 
 
 if __name__ == "__main__":
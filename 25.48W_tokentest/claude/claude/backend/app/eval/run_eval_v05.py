@@ -2,57 +2,187 @@
 CLI entrypoint for ver05 batch evaluation with LLM/heuristic modes.
 """
 import argparse
+import asyncio
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterator, List, Optional
 
-from app.eval.loader_v04 import load_content_summaries
-from app.eval.metrics_v04 import token_count_tiktoken, keyword_coverage
-from app.eval.llm_v05 import summarize_lexical, summarize_vector
+from app.eval.loader_v04 import iter_content_summaries
+from app.eval.metrics_v04 import token_count_batch, keyword_coverage
+from app.eval.llm_v05 import (
+    LLM_CONCURRENCY,
+    LLM_RPM,
+    LLM_TPM,
+    AIMDController,
+    RateLimiter,
+    default_client,
+    summarize_batch_async,
+)
+from app.eval.llm_cache_v05 import LLM_CACHE_BYPASS, LLM_CACHE_PATH, LLM_CACHE_TTL, LLMResponseCache, cached_client
 from app.core.summarizer import build_lexical_pipeline, build_vector_pipeline
 from app.core.summary_models import SUMMARY_MODELS
-from app.eval.report_v04 import write_csv, write_md, EvalRow
+from app.eval.report_v04 import BATCH_SIZE, EvalRow, iter_batches, write_reports
 
 
-def build_rows(samples, mode: str, lexical_limit: int, vector_limit: int):
-    rows = []
-    for item in samples:
-        text = (item.get("content_summary") or "").strip()
-        if not text:
-            continue
+def _rows_for_batch(
+    batch,
+    mode: str,
+    lexical_limit: int,
+    vector_limit: int,
+    concurrency: Optional[int] = None,
+    limiter: Optional[RateLimiter] = None,
+    client: Optional[Callable] = None,
+    controller: Optional[AIMDController] = None,
+) -> List[EvalRow]:
+    """한 배치의 요약 → 토큰 수(배치 카운트) → EvalRow. 프로세스 풀 워커에서도 호출된다."""
+    items = [(item, (item.get("content_summary") or "").strip()) for item in batch]
+    items = [(item, text) for item, text in items if text]
+    if mode == "llm":
+        # 배치 내 LLM 호출은 동시 실행 (concurrency 상한 + 분당 제한)
+        llm_pairs = asyncio.run(
+            summarize_batch_async(
+                [text for _, text in items],
+                lexical_limit,
+                vector_limit,
+                model="gpt-5-mini",
+                client=client,
+                concurrency=concurrency,
+                limiter=limiter,
+                controller=controller,
+            )
+        )
+
+    pending = []
+    for i, (item, text) in enumerate(items):
         if mode == "llm":
-            lex_s = summarize_lexical(text, lexical_limit, model="gpt-5-mini")
-            vec_s = summarize_vector(text, vector_limit, model="gpt-5-mini")
+            lex_s, vec_s = llm_pairs[i]
         else:
             lex_pipe = build_lexical_pipeline(text, SUMMARY_MODELS["lexical_v1"], lexical_limit)
             vec_pipe = build_vector_pipeline(text, SUMMARY_MODELS["vector_v1"], vector_limit)
             lex_s = lex_pipe["final_summary"]
             vec_s = vec_pipe["final_summary"]
+        pending.append((item, text, lex_s, vec_s))
+
+    counts = token_count_batch([t for _, text, lex_s, vec_s in pending for t in (text, lex_s, vec_s)])
+    rows = []
+    for i, (item, text, lex_s, _) in enumerate(pending):
         rows.append(
             EvalRow(
                 content_id=item.get("content_id", ""),
                 title=item.get("title", ""),
-                orig_tokens=token_count_tiktoken(text),
-                lexical_tokens=token_count_tiktoken(lex_s),
-                vector_tokens=token_count_tiktoken(vec_s),
+                orig_tokens=counts[3 * i],
+                lexical_tokens=counts[3 * i + 1],
+                vector_tokens=counts[3 * i + 2],
                 keyword_cov=keyword_coverage(text, lex_s),
             )
         )
     return rows
 
 
+def _iter_rows_parallel(batches, build_batch, workers: int) -> Iterator[EvalRow]:
+    """
+    배치를 프로세스 풀에 나눠 보내고 입력 순서대로 행을 내보낸다.
+    동시에 떠 있는 배치는 workers * 2개로 제한해 입력을 통째로 읽지 않는다.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for batch in batches:
+            in_flight.append(pool.submit(build_batch, batch))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def iter_rows(
+    samples,
+    mode: str,
+    lexical_limit: int,
+    vector_limit: int,
+    batch_size: int = BATCH_SIZE,
+    workers: int = 1,
+    concurrency: Optional[int] = None,
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None,
+    client: Optional[Callable] = None,
+) -> Iterator[EvalRow]:
+    """
+    samples를 batch_size 단위로 평가해 EvalRow를 순서대로 내보낸다.
+    workers > 1 이면 heuristic 모드 배치를 프로세스 풀에서 병렬 처리한다 (출력 순서/내용은 동일).
+    llm 모드는 배치마다 concurrency개까지 동시 호출하고, rpm/tpm 제한은 실행 전체에 걸쳐 적용한다.
+    429를 받으면 실행 전체가 공유하는 AIMD controller가 동시 호출 수를 줄였다가 성공에 따라 다시 늘린다.
+    client는 LLM 호출 함수 (예: cached_client()로 감싼 client), None이면 기본 client.
+    """
+    build_batch = partial(_rows_for_batch, mode=mode, lexical_limit=lexical_limit, vector_limit=vector_limit)
+    if mode == "llm":
+        limiter = RateLimiter(rpm=LLM_RPM if rpm is None else rpm, tpm=LLM_TPM if tpm is None else tpm)
+        max_calls = max(1, concurrency or LLM_CONCURRENCY)
+        controller = AIMDController(initial=max_calls, max_limit=max_calls)
+        build_batch = partial(
+            build_batch, concurrency=concurrency, limiter=limiter, client=client, controller=controller
+        )
+    batches = iter_batches(samples, batch_size)
+    if workers > 1 and mode == "heuristic":
+        yield from _iter_rows_parallel(batches, build_batch, workers)
+        return
+    for batch in batches:
+        yield from build_batch(batch)
+
+
+def build_rows(
+    samples,
+    mode: str,
+    lexical_limit: int,
+    vector_limit: int,
+    batch_size: int = BATCH_SIZE,
+    workers: int = 1,
+):
+    return list(iter_rows(samples, mode, lexical_limit, vector_limit, batch_size, workers))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run ver05 batch evaluation")
-    parser.add_argument("--input", required=True, help="Path to content_summary JSON")
+    parser.add_argument("--input", required=True, help="Path to content_summary JSON/JSONL")
     parser.add_argument("--output-csv", required=True, help="Per-document CSV output")
     parser.add_argument("--output-md", required=True, help="Markdown summary output")
     parser.add_argument("--mode", default="heuristic", choices=["heuristic", "llm"], help="Evaluation mode")
     parser.add_argument("--lexical-limit", type=int, default=128)
     parser.add_argument("--vector-limit", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Samples per token-count batch")
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size for heuristic mode (1 = serial)")
+    parser.add_argument("--concurrency", type=int, default=LLM_CONCURRENCY, help="Concurrent LLM calls in llm mode")
+    parser.add_argument("--rpm", type=int, default=LLM_RPM, help="LLM requests per minute (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=LLM_TPM, help="LLM tokens per minute (0 = unlimited)")
+    parser.add_argument("--llm-cache", default=LLM_CACHE_PATH, help="SQLite path for cached LLM responses")
+    parser.add_argument("--llm-cache-ttl", type=float, default=LLM_CACHE_TTL, help="LLM cache TTL seconds (0 = no expiry)")
+    parser.add_argument("--no-llm-cache", action="store_true", default=LLM_CACHE_BYPASS, help="Bypass the LLM cache")
     args = parser.parse_args()
 
-    samples = load_content_summaries(args.input)
-    rows = build_rows(samples, args.mode, args.lexical_limit, args.vector_limit)
-    write_csv(rows, args.output_csv)
-    write_md(rows, args.output_md)
+    cache = None
+    client = None
+    if args.mode == "llm" and args.llm_cache:
+        cache = LLMResponseCache(args.llm_cache, ttl=args.llm_cache_ttl)
+        client = cached_client(default_client, cache, bypass=args.no_llm_cache)
+
+    samples = iter_content_summaries(args.input)
+    rows = iter_rows(
+        samples,
+        args.mode,
+        args.lexical_limit,
+        args.vector_limit,
+        args.batch_size,
+        args.workers,
+        concurrency=args.concurrency,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        client=client,
+    )
+    write_reports(rows, args.output_csv, args.output_md)
+    if cache is not None:
+        print("llm cache:", cache.stats(), file=sys.stderr)
+        cache.close()
 
 
 if __name__ == "__main__":
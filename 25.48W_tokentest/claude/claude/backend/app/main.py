@@ -3,14 +3,30 @@ from dotenv import load_dotenv
 # .env 파일 자동 로드 (최대한 빨리 호출)
 load_dotenv()
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.api.v1 import routes
+from app.services.image_utils import shutdown_image_executor
+from app.services.providers import gpt5_provider
 from fastapi.middleware.cors import CORSMiddleware
 
 # .env 파일 자동 로드 (개발 편의)
 load_dotenv()
 
-app = FastAPI(title="claude-skeleton-api")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 모델 호출용 HTTP 커넥션 풀은 앱 수명 동안 하나만 유지
+    await gpt5_provider.open_http_client()
+    try:
+        yield
+    finally:
+        await gpt5_provider.close_http_client()
+        shutdown_image_executor()
+
+
+app = FastAPI(title="claude-skeleton-api", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,159 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+import heapq
+import math
+import re
+
+import numpy as np
+
+# 영문/숫자/한글 단어 단위 토큰 (소문자)
+TOKEN_RE = re.compile(r"[\w가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class BM25Index:
+    """
+    In-memory inverted index with Okapi BM25 scoring.
+
+    - postings: term -> [(doc_index, tf)], built once (add() appends)
+    - search(query, top_k): term-at-a-time scoring with MaxScore-style early
+      termination; once top_k candidates exist and the remaining terms' upper
+      bound cannot beat the k-th score, remaining lists only update docs
+      already scored. Top-k is picked with a heap.
+    - search_batch(queries, top_k): many queries at once; each term's posting
+      list is turned into NumPy (doc index, score contribution) arrays once
+      and reused by every query in the batch (and later batches until add())
+    Results are [{"id", "score"}] ready for hybrid_merge(bm25_results=...).
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.doc_lens: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._total_len = 0
+        # term -> (doc index 배열, 항 점수 배열); add() 시 비움
+        self._term_arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # add()마다 증가 (결과 캐시 무효화용)
+        self.version = 0
+
+    @classmethod
+    def build(
+        cls,
+        docs: Iterable[Dict],
+        fields: Sequence[str] = ("title", "snippet"),
+        id_field: str = "id",
+        **kwargs,
+    ) -> "BM25Index":
+        index = cls(**kwargs)
+        for doc in docs:
+            index.add(doc[id_field], " ".join(str(doc.get(f) or "") for f in fields))
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, doc_id: str, text: str) -> None:
+        doc_index = len(self.ids)
+        terms = tokenize(text)
+        tfs: Dict[str, int] = {}
+        for term in terms:
+            tfs[term] = tfs.get(term, 0) + 1
+        for term, tf in tfs.items():
+            self.postings.setdefault(term, []).append((doc_index, tf))
+        self.ids.append(doc_id)
+        self.doc_lens.append(len(terms))
+        self._total_len += len(terms)
+        # avg_doc_len이 바뀌므로 미리 계산한 항 점수는 모두 무효
+        self._term_arrays.clear()
+        self.version += 1
+
+    @property
+    def avg_doc_len(self) -> float:
+        return (self._total_len / len(self.ids)) if self.ids else 0.0
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.ids)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 10) -> List[Dict]:
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self.postings]
+        if not terms or top_k <= 0:
+            return []
+        k1, b = self.k1, self.b
+        avg = self.avg_doc_len or 1.0
+        doc_lens = self.doc_lens
+
+        # tf → ∞ 일 때 항 점수 상한 = idf * (k1 + 1); 상한 큰 항부터 처리
+        weighted = sorted(((self.idf(t), t) for t in terms), reverse=True)
+        upper = [idf * (k1 + 1) for idf, _ in weighted]
+        remaining = [sum(upper[i:]) for i in range(len(upper))] + [0.0]
+
+        scores: Dict[int, float] = {}
+        admit_new = True
+        for i, (idf, term) in enumerate(weighted):
+            if admit_new and len(scores) >= top_k:
+                threshold = heapq.nlargest(top_k, scores.values())[-1]
+                admit_new = remaining[i] > threshold
+            for doc_index, tf in self.postings[term]:
+                if not admit_new and doc_index not in scores:
+                    continue
+                norm = k1 * (1.0 - b + b * doc_lens[doc_index] / avg)
+                scores[doc_index] = scores.get(doc_index, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [{"id": self.ids[doc_index], "score": score} for doc_index, score in best]
+
+    def _arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        cached = self._term_arrays.get(term)
+        if cached is None:
+            k1, b = self.k1, self.b
+            avg = self.avg_doc_len or 1.0
+            postings = self.postings[term]
+            docs = np.fromiter((d for d, _ in postings), dtype=np.int64, count=len(postings))
+            tf = np.fromiter((t for _, t in postings), dtype=np.float64, count=len(postings))
+            lens = np.asarray(self.doc_lens, dtype=np.float64)[docs]
+            norm = k1 * (1.0 - b + b * lens / avg)
+            # search()와 같은 연산 순서 (같은 부동소수 결과)
+            cached = (docs, self.idf(term) * tf * (k1 + 1) / (tf + norm))
+            self._term_arrays[term] = cached
+        return cached
+
+    def search_batch(self, queries: Sequence[str], top_k: int = 10) -> List[List[Dict]]:
+        """
+        search()를 쿼리마다 부르는 것과 같은 결과 (입력 순서).
+        같은 항 집합의 쿼리는 한 번만 계산하고, 점수 누적은 재사용하는 dense 버퍼에 벡터 연산으로.
+        """
+        out: List[List[Dict]] = []
+        done: Dict[Tuple[str, ...], List[Dict]] = {}
+        buf = np.zeros(len(self.ids), dtype=np.float64)
+        for query in queries:
+            terms = [t for t in dict.fromkeys(tokenize(query)) if t in self.postings]
+            # idf 내림차순 (search()의 누적 순서와 동일)
+            terms.sort(key=lambda t: (self.idf(t), t), reverse=True)
+            sig = tuple(terms)
+            if sig not in done:
+                if not terms or top_k <= 0:
+                    done[sig] = []
+                else:
+                    arrays = [self._arrays(t) for t in terms]
+                    for docs, contrib in arrays:
+                        buf[docs] += contrib
+                    touched = np.unique(np.concatenate([docs for docs, _ in arrays]))
+                    scores = buf[touched]
+                    buf[touched] = 0.0
+                    k = min(top_k, len(touched))
+                    if k < len(touched):
+                        # k번째 점수와 동점인 문서까지 후보로 두고 doc index 순으로 자름 (search()와 동일한 동점 처리)
+                        kth = -np.partition(-scores, k - 1)[k - 1]
+                        cand = np.flatnonzero(scores >= kth)
+                    else:
+                        cand = np.arange(len(touched))
+                    order = cand[np.lexsort((touched[cand], -scores[cand]))][:k]
+                    done[sig] = [{"id": self.ids[touched[i]], "score": float(scores[i])} for i in order]
+            out.append(done[sig])
+        return out
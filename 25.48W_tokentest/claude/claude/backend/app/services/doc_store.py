@@ -0,0 +1,196 @@
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# 문서 저장소 파일 경로 (빈 값이면 임시 디렉터리에 내용 해시로 이름을 정해 생성 → 같은 코퍼스면 워커들이 같은 파일 공유)
+DOC_STORE_PATH = os.getenv("DOC_STORE_PATH", "")
+
+COLUMNS = ("id", "title", "snippet")
+_MAGIC = b"DOCSTOR2"
+_DIGEST_BYTES = 16
+# magic(8) + 문서 수(8) + 코퍼스 digest(16)
+_HEADER_BYTES = 32
+
+
+def corpus_digest(docs: Sequence[Dict]) -> str:
+    """docs의 (id, title, snippet) 내용 해시 (hex). 저장소 파일 헤더에 기록되어 코퍼스 일치 여부 확인에 사용."""
+    payload = json.dumps([[str(d.get(c, "")) for c in COLUMNS] for d in docs], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=_DIGEST_BYTES).hexdigest()
+
+
+class DocStore:
+    """
+    Read-only memory-mapped columnar store for search result documents.
+
+    파일 구성 (한 파일, 모두 little-endian int64):
+    - header: magic + n + corpus digest
+    - offsets: (len(COLUMNS), n + 1) — 컬럼별 UTF-8 값의 blob 내 시작/끝 위치
+    - id_order: (n,) — id 바이트 정렬 순 row 번호 (id → row 이진 탐색용 인덱스)
+    - blob: 컬럼 값들을 이어 붙인 UTF-8 바이트
+
+    mmap(ACCESS_READ)로 열기 때문에 여러 워커가 OS page cache를 공유하고 코퍼스가
+    각 워커 힙에 복사되지 않음. 첫 접근 시에 매핑(lazy); 조회 비용은 id당 O(log n).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mm: Optional[mmap.mmap] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._order: Optional[np.ndarray] = None
+        self._blob_start = 0
+        self._n = 0
+        self._digest = ""
+
+    @staticmethod
+    def write(path: str, docs: Sequence[Dict]) -> None:
+        """docs를 저장소 파일로 기록 (임시 파일 + os.replace로 원자적 교체)."""
+        digest = corpus_digest(docs)
+        columns: List[List[bytes]] = [[] for _ in COLUMNS]
+        for doc in docs:
+            for col, name in zip(columns, COLUMNS):
+                col.append(str(doc.get(name, "")).encode("utf-8"))
+        ids = columns[0]
+        if len(set(ids)) != len(ids):
+            raise ValueError("duplicate document ids")
+        n = len(ids)
+
+        offsets = np.zeros((len(COLUMNS), n + 1), dtype="<i8")
+        pos = 0
+        for c, col in enumerate(columns):
+            offsets[c, 0] = pos
+            for i, value in enumerate(col):
+                pos += len(value)
+                offsets[c, i + 1] = pos
+        order = np.array(sorted(range(n), key=ids.__getitem__), dtype="<i8")
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_MAGIC)
+                f.write(np.array([n], dtype="<i8").tobytes())
+                f.write(bytes.fromhex(digest))
+                f.write(offsets.tobytes())
+                f.write(order.tobytes())
+                for col in columns:
+                    f.writelines(col)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _open(self) -> None:
+        with self._lock:
+            if self._mm is not None:
+                return
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if mm[:8] != _MAGIC:
+                mm.close()
+                raise ValueError(f"not a document store file: {self.path}")
+            n = int(np.frombuffer(mm, dtype="<i8", count=1, offset=8)[0])
+            self._digest = mm[16:_HEADER_BYTES].hex()
+            cols = len(COLUMNS)
+            self._offsets = np.frombuffer(mm, dtype="<i8", count=cols * (n + 1), offset=_HEADER_BYTES).reshape(
+                cols, n + 1
+            )
+            order_at = _HEADER_BYTES + cols * (n + 1) * 8
+            self._order = np.frombuffer(mm, dtype="<i8", count=n, offset=order_at)
+            self._blob_start = order_at + n * 8
+            self._n = n
+            self._mm = mm
+
+    @staticmethod
+    def read_digest(path: str) -> Optional[str]:
+        """파일 헤더의 코퍼스 digest; 파일이 없거나 저장소 형식이 아니면 None (매핑하지 않음)."""
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER_BYTES)
+        except FileNotFoundError:
+            return None
+        if len(header) < _HEADER_BYTES or header[:8] != _MAGIC:
+            return None
+        return header[16:_HEADER_BYTES].hex()
+
+    @property
+    def digest(self) -> str:
+        if self._mm is None:
+            self._open()
+        return self._digest
+
+    @property
+    def is_open(self) -> bool:
+        return self._mm is not None
+
+    def __len__(self) -> int:
+        if self._mm is None:
+            self._open()
+        return self._n
+
+    def _value(self, col: int, row: int) -> bytes:
+        start = self._blob_start + int(self._offsets[col, row])
+        end = self._blob_start + int(self._offsets[col, row + 1])
+        return self._mm[start:end]
+
+    def row_of(self, doc_id: str) -> Optional[int]:
+        """id_order 위에서 이진 탐색; 없으면 None."""
+        if self._mm is None:
+            self._open()
+        target = doc_id.encode("utf-8")
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._value(0, int(self._order[mid])) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n:
+            row = int(self._order[lo])
+            if self._value(0, row) == target:
+                return row
+        return None
+
+    def row(self, row: int) -> Dict[str, str]:
+        if self._mm is None:
+            self._open()
+        return {name: self._value(c, row).decode("utf-8") for c, name in enumerate(COLUMNS)}
+
+    def get(self, doc_id: str) -> Optional[Dict[str, str]]:
+        row = self.row_of(doc_id)
+        return None if row is None else self.row(row)
+
+    def get_many(self, doc_ids: Sequence[str]) -> List[Optional[Dict[str, str]]]:
+        return [self.get(doc_id) for doc_id in doc_ids]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mm is not None:
+                # numpy view가 버퍼를 잡고 있으므로 먼저 해제
+                self._offsets = None
+                self._order = None
+                self._mm.close()
+                self._mm = None
+
+
+def default_doc_store(docs: Sequence[Dict], path: str = DOC_STORE_PATH) -> DocStore:
+    """
+    docs와 내용이 같은 저장소를 돌려줌 (매핑은 첫 조회 때 일어남).
+
+    - path가 비어 있으면 docs 내용 digest로 임시 디렉터리 경로를 정함
+    - 파일이 없거나 헤더 digest가 docs와 다르면 (다른 코퍼스로 만든 파일) 다시 기록
+    """
+    digest = corpus_digest(docs)
+    if not path:
+        path = os.path.join(tempfile.gettempdir(), f"doc_store-{digest}.bin")
+    if DocStore.read_digest(path) != digest:
+        DocStore.write(path, docs)
+    return DocStore(path)
@@ -1,4 +1,28 @@
-from typing import Any, Callable, Sequence
+from array import array
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import asyncio
+import inspect
+import os
+import sqlite3
+import threading
+import time
+
+from app.core.memo_cache import MemoCache
+
+# 쿼리 임베딩 캐시 설정: 메모리 LRU 예산 / TTL(0이면 만료 없음) / 워커 간 공유용 SQLite 경로(빈 값이면 사용 안 함)
+EMBED_CACHE_MAX_BYTES = int(os.getenv("EMBED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EMBED_CACHE_TTL = float(os.getenv("EMBED_CACHE_TTL", "0"))
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "")
+EMBED_CACHE_SHARED_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_SHARED_MAX_ENTRIES", "1000000"))
+
+# micro-batcher: 동시 요청을 모으는 최대 대기(ms, 0이면 사용 안 함) / 한 번에 보낼 최대 쿼리 수
+EMBED_BATCH_WAIT_MS = float(os.getenv("EMBED_BATCH_WAIT_MS", "0"))
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "64"))
+
+BatchEmbedFn = Callable[[List[str]], Union[Sequence[Sequence[float]], Awaitable[Sequence[Sequence[float]]]]]
+
+# list[float] 한 원소 대략치 (포인터 8 + float 객체 24)
+_FLOAT_ITEM_BYTES = 32
 
 
 def get_query_embedding(
@@ -27,3 +51,303 @@ def get_query_embedding(
     embedding = embed_fn(normalized)
     cache_set(normalized, embedding)
     return embedding
+
+
+def _normalize_query(query: str) -> str:
+    normalized = (query or "").strip()
+    if not normalized:
+        raise ValueError("query must be a non-empty string")
+    return normalized
+
+
+def _lookup_batch(
+    queries: Sequence[str],
+    cache_get: Callable[[str], Any],
+) -> Tuple[List[str], List[Any], List[str]]:
+    """(정규화된 쿼리, 캐시 결과(미스는 None), 중복 제거된 미스 목록)."""
+    keys = [_normalize_query(q) for q in queries]
+    found = [cache_get(k) for k in keys]
+    misses = list(dict.fromkeys(k for k, v in zip(keys, found) if v is None))
+    return keys, found, misses
+
+
+def _fill_batch(
+    keys: List[str],
+    found: List[Any],
+    misses: List[str],
+    vectors: Sequence[Sequence[float]],
+    cache_set: Callable[[str, Any], None],
+) -> List[Sequence[float]]:
+    if len(vectors) != len(misses):
+        raise ValueError(f"embed_batch_fn returned {len(vectors)} vectors for {len(misses)} queries")
+    computed = dict(zip(misses, vectors))
+    for key, vec in computed.items():
+        cache_set(key, vec)
+    return [v if v is not None else computed[k] for k, v in zip(keys, found)]
+
+
+def get_query_embeddings(
+    queries: Sequence[str],
+    cache_get: Callable[[str], Any],
+    cache_set: Callable[[str, Any], None],
+    embed_batch_fn: Callable[[List[str]], Sequence[Sequence[float]]],
+) -> List[Sequence[float]]:
+    """
+    Batch version of get_query_embedding().
+
+    - Every query is validated/normalized and looked up in the cache.
+    - The distinct misses go to embed_batch_fn in one call (skipped when all hit).
+    - Results are cached and returned in input order.
+    """
+    keys, found, misses = _lookup_batch(queries, cache_get)
+    vectors = embed_batch_fn(misses) if misses else []
+    return _fill_batch(keys, found, misses, vectors, cache_set)
+
+
+async def get_query_embeddings_async(
+    queries: Sequence[str],
+    cache_get: Callable[[str], Any],
+    cache_set: Callable[[str, Any], None],
+    embed_batch_fn: BatchEmbedFn,
+) -> List[Sequence[float]]:
+    """get_query_embeddings()와 같지만 embed_batch_fn이 coroutine이어도 된다."""
+    keys, found, misses = _lookup_batch(queries, cache_get)
+    vectors: Sequence[Sequence[float]] = []
+    if misses:
+        vectors = embed_batch_fn(misses)
+        if inspect.isawaitable(vectors):
+            vectors = await vectors
+    return _fill_batch(keys, found, misses, vectors, cache_set)
+
+
+class EmbeddingMicroBatcher:
+    """
+    Async micro-batcher: concurrent embed() calls arriving within max_wait
+    seconds (or until max_batch queries) share one embed_batch_fn call.
+
+    - cache_get/cache_set (optional): looked up/filled per batch, so hits never reach the backend
+    - duplicate queries inside a batch are embedded once
+    - a backend error fails every caller in that batch
+    - stats(): requests / batches / embedded (queries sent to the backend)
+    """
+
+    def __init__(
+        self,
+        embed_batch_fn: BatchEmbedFn,
+        cache_get: Callable[[str], Any] = lambda key: None,
+        cache_set: Callable[[str, Any], None] = lambda key, value: None,
+        max_batch: int = EMBED_BATCH_MAX,
+        max_wait: float = EMBED_BATCH_WAIT_MS / 1000.0,
+    ):
+        self.embed_batch_fn = embed_batch_fn
+        self.cache_get = cache_get
+        self.cache_set = cache_set
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.requests = 0
+        self.batches = 0
+        self.embedded = 0
+
+    async def embed(self, query: str) -> Sequence[float]:
+        normalized = _normalize_query(query)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((normalized, future))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        self.batches += 1
+        queries = [q for q, _ in batch]
+
+        def counting_embed(misses: List[str]):
+            self.embedded += len(misses)
+            return self.embed_batch_fn(misses)
+
+        try:
+            vectors = await get_query_embeddings_async(queries, self.cache_get, self.cache_set, counting_embed)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vec in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vec)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "embedded": self.embedded,
+            "avg_batch": (self.requests / self.batches) if self.batches else None,
+        }
+
+
+class SharedEmbeddingStore:
+    """
+    SQLite(WAL) 기반 공유 계층: 같은 호스트의 uvicorn 워커들이 서로의 임베딩을 재사용.
+
+    - 벡터는 float64 BLOB으로 저장 → 메모리 계층/새 계산과 같은 값 (float32로 줄이면 계층마다 점수가 달라짐)
+    - ttl: 초 단위 (0이면 만료 없음), max_entries 초과 시 오래된 행부터 삭제
+    """
+
+    # 매 set마다 COUNT 하지 않도록 이 횟수마다 한 번 정리
+    TRIM_EVERY = 256
+    # float32 BLOB을 쓰던 이전 테이블(query_embeddings)과 섞이지 않도록 별도 테이블
+    TABLE = "query_embeddings_f64"
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = EMBED_CACHE_TTL,
+        max_entries: int = EMBED_CACHE_SHARED_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+            " key TEXT PRIMARY KEY,"
+            " vec BLOB NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.TABLE}_created ON {self.TABLE}(created_at)"
+        )
+
+    def get(self, key: str) -> Optional[array]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT vec, created_at FROM {self.TABLE} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        blob, created_at = row
+        if self.ttl and self._clock() - created_at > self.ttl:
+            return None
+        vec = array("d")
+        vec.frombytes(blob)
+        return vec
+
+    def set(self, key: str, vec: Sequence[float]) -> None:
+        blob = array("d", vec).tobytes()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} (key, vec, created_at) VALUES (?, ?, ?)",
+                (key, blob, self._clock()),
+            )
+            self._writes += 1
+            if self._writes % self.TRIM_EVERY == 0:
+                self._trim()
+
+    def _trim(self) -> None:
+        if self.ttl:
+            self._conn.execute(
+                f"DELETE FROM {self.TABLE} WHERE created_at < ?", (self._clock() - self.ttl,)
+            )
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                f"DELETE FROM {self.TABLE} WHERE key IN"
+                f" (SELECT key FROM {self.TABLE} ORDER BY created_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.TABLE}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache:
+    """
+    Bounded query-embedding cache for get_query_embedding(cache_get=..., cache_set=...).
+
+    - memory tier: MemoCache LRU under max_bytes, optional ttl
+    - shared tier (optional): SharedEmbeddingStore; memory misses are looked
+      up there and promoted, sets are written through
+    - vectors are kept as float64 lists in every tier, so a hit returns the
+      same values whichever tier served it
+    - stats(): memory hits/misses/evictions/expired plus shared_hits/shared_misses
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = EMBED_CACHE_MAX_BYTES,
+        ttl: Optional[float] = EMBED_CACHE_TTL,
+        shared: Optional[SharedEmbeddingStore] = None,
+    ):
+        self.memory = MemoCache(max_bytes=max_bytes, ttl=ttl or None)
+        self.shared = shared
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    @staticmethod
+    def _size(vec: Sequence[float]) -> int:
+        return len(vec) * _FLOAT_ITEM_BYTES
+
+    def get(self, key: str) -> Optional[Sequence[float]]:
+        vec = self.memory.get(key)
+        if vec is not None or self.shared is None:
+            return vec
+        vec = self.shared.get(key)
+        if vec is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        vec = list(vec)
+        self.memory.set(key, vec, size=self._size(vec))
+        return vec
+
+    def set(self, key: str, vec: Sequence[float]) -> None:
+        # 모든 계층이 같은 표현(float64 list)을 돌려주도록 맞춤
+        vec = [float(x) for x in vec]
+        self.memory.set(key, vec, size=self._size(vec))
+        if self.shared is not None:
+            self.shared.set(key, vec)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.shared is not None:
+            self.shared.clear()
+        self.shared_hits = self.shared_misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self.memory.stats())
+        if self.shared is not None:
+            stats.update(shared_hits=self.shared_hits, shared_misses=self.shared_misses)
+        return stats
+
+
+def default_embedding_cache() -> EmbeddingCache:
+    """환경 변수 설정으로 캐시 생성 (EMBED_CACHE_PATH가 있으면 공유 계층 포함)."""
+    shared = SharedEmbeddingStore(EMBED_CACHE_PATH) if EMBED_CACHE_PATH else None
+    return EmbeddingCache(shared=shared)
@@ -1,10 +1,125 @@
-from typing import Dict, List, Optional
+import heapq
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+FUSION_METHODS = ("weighted", "rrf", "minmax", "zscore")
+# 후보 수(두 leg 합)가 이 이상이면 NumPy 경로로 점수 계산
+HYBRID_NUMPY_MIN = int(os.getenv("HYBRID_NUMPY_MIN", "10000"))
+# RRF 상수 k (score = w / (k + rank))
+RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
 
 
 def _extract_id(item: Dict) -> Optional[str]:
     return item.get("id") or item.get("doc_id")
 
 
+def _collect(bm25_results: List[Dict], vector_results: List[Dict]) -> Tuple[List[str], List[List[float]], List[List[bool]]]:
+    """
+    doc id를 처음 등장 순서대로 slot에 배정하고 leg별 점수/존재 여부를 평행 리스트로 모음.
+    (후보마다 dict를 만들지 않음; 같은 leg 안의 중복 id는 마지막 값이 이김)
+    """
+    slots: Dict[str, int] = {}
+    ids: List[str] = []
+    scores: List[List[float]] = [[], []]
+    present: List[List[bool]] = [[], []]
+    for leg, items in enumerate((bm25_results, vector_results)):
+        for item in items:
+            doc_id = _extract_id(item)
+            if doc_id is None:
+                continue
+            slot = slots.get(doc_id)
+            if slot is None:
+                slot = slots[doc_id] = len(ids)
+                ids.append(doc_id)
+                for col in scores:
+                    col.append(0.0)
+                for col in present:
+                    col.append(False)
+            scores[leg][slot] = float(item.get("score", 0.0))
+            present[leg][slot] = True
+    return ids, scores, present
+
+
+def _mean_std(vals) -> Tuple[float, float]:
+    """zscore 통계: 두 경로가 같은 부동소수 결과를 내도록 fsum으로 계산 (numpy 합은 pairwise라 값이 다름)."""
+    n = len(vals)
+    mean = math.fsum(vals) / n
+    return mean, math.sqrt(math.fsum((v - mean) ** 2 for v in vals) / n)
+
+
+def _normalize(values: List[float], mask: List[bool], method: str) -> List[float]:
+    """leg 하나의 점수를 정규화; leg에 없는 문서는 그 leg의 최저값을 받음."""
+    vals = [v for v, m in zip(values, mask) if m]
+    if not vals:
+        return [0.0] * len(values)
+    if method == "rrf":
+        order = sorted((i for i, m in enumerate(mask) if m), key=lambda i: -values[i])
+        out = [0.0] * len(values)
+        for rank, i in enumerate(order, start=1):
+            out[i] = 1.0 / (RRF_K + rank)
+        return out
+    if method == "minmax":
+        lo, hi = min(vals), max(vals)
+        span = hi - lo
+        return [((v - lo) / span if span else 1.0) if m else 0.0 for v, m in zip(values, mask)]
+    # zscore
+    mean, std = _mean_std(vals)
+    z = [(v - mean) / std if std else 0.0 for v in values]
+    floor = min(zi for zi, m in zip(z, mask) if m)
+    return [zi if m else floor for zi, m in zip(z, mask)]
+
+
+def _normalize_np(values: np.ndarray, mask: np.ndarray, method: str) -> np.ndarray:
+    if not mask.any():
+        return np.zeros_like(values)
+    if method == "rrf":
+        out = np.zeros_like(values)
+        idx = np.flatnonzero(mask)
+        order = idx[np.argsort(-values[idx], kind="stable")]
+        out[order] = 1.0 / (RRF_K + np.arange(1, len(order) + 1))
+        return out
+    vals = values[mask]
+    if method == "minmax":
+        lo, span = vals.min(), vals.max() - vals.min()
+        norm = (values - lo) / span if span else np.ones_like(values)
+        return np.where(mask, norm, 0.0)
+    mean, std = _mean_std(vals.tolist())
+    z = (values - mean) / std if std else np.zeros_like(values)
+    return np.where(mask, z, z[mask].min())
+
+
+def _fuse_python(scores, present, method, weights) -> List[float]:
+    if method == "weighted":
+        legs = scores
+    else:
+        legs = [_normalize(s, m, method) for s, m in zip(scores, present)]
+    return [weights[0] * b + weights[1] * v for b, v in zip(*legs)]
+
+
+def _fuse_numpy(scores, present, method, weights) -> np.ndarray:
+    arrays = [np.asarray(s, dtype=np.float64) for s in scores]
+    if method != "weighted":
+        arrays = [_normalize_np(a, np.asarray(m, dtype=bool), method) for a, m in zip(arrays, present)]
+    return weights[0] * arrays[0] + weights[1] * arrays[1]
+
+
+def _top_slots_np(fused: np.ndarray, top_k: int) -> List[int]:
+    k = min(top_k, fused.shape[0])
+    if k <= 0:
+        return []
+    if k < fused.shape[0]:
+        # k번째 점수와 동점인 slot까지 모두 후보로 둔 뒤 자름 → 동점은 먼저 등장한 문서 우선 (Python 경로와 동일)
+        kth = -np.partition(-fused, k - 1)[k - 1]
+        cand = np.flatnonzero(fused >= kth)
+    else:
+        cand = np.arange(fused.shape[0])
+    order = np.lexsort((cand, -fused[cand]))[:k]
+    return cand[order].tolist()
+
+
 def hybrid_merge(
     bm25_results: List[Dict],
     vector_results: List[Dict],
@@ -12,34 +127,35 @@ def hybrid_merge(
     bm25_weight: float = 0.5,
     vector_weight: float = 0.5,
     top_k: int = 10,
+    method: str = "weighted",
 ) -> List[Dict]:
     """
     Merge BM25 and vector search results:
     - Deduplicate by doc id.
-    - Weighted score: bm25_weight * bm25_score + vector_weight * vector_score.
+    - method="weighted" (default): bm25_weight * bm25_score + vector_weight * vector_score.
+    - method="rrf": reciprocal-rank fusion, weight / (RRF_K + rank) per leg.
+    - method="minmax" / "zscore": normalise each leg before the weighted sum,
+      so BM25 and cosine scales don't dominate each other. A doc missing from
+      a leg gets that leg's lowest normalised value.
     - Handle bm25-only or vector-only inputs.
-    - Return top_k sorted by combined score desc.
+    - Return top_k sorted by combined score desc (heap / argpartition selection;
+      only the returned entries are materialised as dicts). bm25_score and
+      vector_score stay the raw leg scores.
     """
-    merged: Dict[str, Dict] = {}
+    if method not in FUSION_METHODS:
+        raise ValueError(f"unknown fusion method: {method!r}")
+    ids, scores, present = _collect(bm25_results, vector_results)
+    weights = (bm25_weight, vector_weight)
 
-    def add(items: List[Dict], key: str):
-        for item in items:
-            doc_id = _extract_id(item)
-            if doc_id is None:
-                continue
-            entry = merged.setdefault(
-                doc_id,
-                {"id": doc_id, "bm25_score": 0.0, "vector_score": 0.0},
-            )
-            entry[key] = float(item.get("score", 0.0))
-
-    add(bm25_results, "bm25_score")
-    add(vector_results, "vector_score")
-
-    combined: List[Dict] = []
-    for entry in merged.values():
-        score = bm25_weight * entry["bm25_score"] + vector_weight * entry["vector_score"]
-        combined.append({**entry, "score": score})
-
-    combined.sort(key=lambda x: x["score"], reverse=True)
-    return combined[:top_k]
+    if len(ids) >= HYBRID_NUMPY_MIN:
+        fused = _fuse_numpy(scores, present, method, weights)
+        top = _top_slots_np(fused, top_k)
+    else:
+        fused = _fuse_python(scores, present, method, weights)
+        # nlargest는 sorted(..., reverse=True)[:k]와 같은 (안정) 순서
+        top = heapq.nlargest(top_k, range(len(ids)), key=fused.__getitem__)
+
+    return [
+        {"id": ids[i], "bm25_score": scores[0][i], "vector_score": scores[1][i], "score": float(fused[i])}
+        for i in top
+    ]
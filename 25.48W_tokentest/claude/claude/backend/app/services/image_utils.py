@@ -1,8 +1,87 @@
-from PIL import Image
+import asyncio
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import BinaryIO, Callable, Dict, Optional, Tuple, TypeVar, Union
+
+from PIL import Image, features
 from io import BytesIO
 
-def preprocess_image_bytes(data: bytes, max_size=(1024,1024)) -> bytes:
-    img = Image.open(BytesIO(data))
+# 이미지 디코드/리사이즈/인코딩 전용 워커 수 (이벤트 루프를 막지 않도록 분리)
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+# 업로드 원본 바이트 상한 / 디코드 전에 헤더로 거르는 픽셀 수 상한
+IMAGE_MAX_UPLOAD_BYTES = int(os.getenv("IMAGE_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(50_000_000)))
+
+# 인코더 모드: "default"(1024px JPEG, 기본 품질) | "budget"(바이트 예산 맞춤 인코딩)
+IMAGE_ENCODER = os.getenv("IMAGE_ENCODER", "default").lower()
+IMAGE_BYTE_BUDGET = int(os.getenv("IMAGE_BYTE_BUDGET", str(200 * 1024)))
+IMAGE_MAX_AREA = int(os.getenv("IMAGE_MAX_AREA", str(1024 * 1024)))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "jpeg").upper()
+IMAGE_MIN_QUALITY = int(os.getenv("IMAGE_MIN_QUALITY", "40"))
+IMAGE_MAX_QUALITY = int(os.getenv("IMAGE_MAX_QUALITY", "90"))
+# 최저 품질로도 예산을 넘으면 이 비율로 줄여 다시 탐색 (짧은 변이 이 값보다 작아지면 중단)
+IMAGE_DOWNSCALE_STEP = 0.75
+IMAGE_MIN_SIDE = 64
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+T = TypeVar("T")
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def get_image_executor() -> ThreadPoolExecutor:
+    """IMAGE_WORKERS 크기의 공유 스레드 풀 (PIL은 디코드/리사이즈 중 GIL을 놓는다)."""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=max(1, IMAGE_WORKERS), thread_name_prefix="image")
+    return _EXECUTOR
+
+
+def shutdown_image_executor() -> None:
+    global _EXECUTOR
+    executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def run_in_image_pool(fn: Callable[..., T], *args, **kwargs) -> T:
+    """fn(*args)를 이미지 풀에서 실행하고 결과를 await (동시 실행은 IMAGE_WORKERS개로 제한)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_image_executor(), partial(fn, *args, **kwargs))
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def upload_size(f: BinaryIO) -> int:
+    """파일 객체 크기 (읽지 않고 seek로 확인, 위치는 처음으로 되돌림)."""
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    return size
+
+
+def _open_checked(data: Union[bytes, BinaryIO]) -> Image.Image:
+    img = Image.open(BytesIO(data) if isinstance(data, (bytes, bytearray)) else data)
+    width, height = img.size
+    if width * height > IMAGE_MAX_PIXELS:
+        raise ImageTooLarge(f"image has {width * height} pixels (max {IMAGE_MAX_PIXELS})")
+    return img
+
+
+def preprocess_image_bytes(data: Union[bytes, BinaryIO], max_size=(1024,1024)) -> bytes:
+    """
+    bytes 또는 (임시 파일로 spool된) 바이너리 파일 객체를 받아 max_size 이하 JPEG로 변환.
+    헤더의 픽셀 수가 IMAGE_MAX_PIXELS를 넘으면 디코드 전에 ImageTooLarge.
+    """
+    img = _open_checked(data)
+    # JPEG는 DCT 스케일링으로 max_size 이상인 1/2~1/8 해상도로만 디코드 (전체 디코드 생략)
+    if img.format == "JPEG":
+        img.draft("RGB", max_size)
     # Ensure JPEG-compatible mode
     if img.mode not in ("RGB", "L"):
         img = img.convert("RGB")
@@ -10,3 +89,88 @@ def preprocess_image_bytes(data: bytes, max_size=(1024,1024)) -> bytes:
     buf = BytesIO()
     img.save(buf, format="JPEG")
     return buf.getvalue()
+
+
+def _encode(img: Image.Image, fmt: str, quality: int) -> bytes:
+    buf = BytesIO()
+    # exif/icc 등 메타데이터는 넘기지 않음 (픽셀만 저장)
+    img.save(buf, format=fmt, quality=quality)
+    return buf.getvalue()
+
+
+def encode_to_budget(
+    img: Image.Image,
+    byte_budget: int = IMAGE_BYTE_BUDGET,
+    max_area: int = IMAGE_MAX_AREA,
+    fmt: str = IMAGE_FORMAT,
+    min_quality: int = IMAGE_MIN_QUALITY,
+    max_quality: int = IMAGE_MAX_QUALITY,
+) -> Tuple[bytes, Dict]:
+    """
+    byte_budget 이하가 되는 가장 높은 품질을 이진 탐색해 인코딩한다.
+
+    - 픽셀 수는 max_area 이하로 먼저 축소
+    - 최저 품질로도 넘으면 IMAGE_DOWNSCALE_STEP씩 줄여 다시 탐색
+    - fmt="WEBP"는 Pillow에 WebP 지원이 없으면 JPEG로 대체
+    반환: (bytes, {"format", "mime", "quality", "width", "height", "bytes", "encodes", "within_budget"})
+    """
+    fmt = fmt.upper()
+    if fmt == "WEBP" and not features.check("webp"):
+        fmt = "JPEG"
+    if fmt not in MIME_TYPES:
+        raise ValueError(f"unsupported image format: {fmt}")
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    width, height = img.size
+    scale = min(1.0, math.sqrt(max_area / float(width * height)))
+    encodes = 0
+    while True:
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        candidate = img if size == img.size else img.resize(size, Image.LANCZOS)
+        best: Optional[Tuple[int, bytes]] = None
+        lo, hi = min_quality, max_quality
+        while lo <= hi:
+            quality = (lo + hi) // 2
+            data = _encode(candidate, fmt, quality)
+            encodes += 1
+            if len(data) <= byte_budget:
+                best = (quality, data)
+                lo = quality + 1
+            else:
+                hi = quality - 1
+        if best is not None or min(size) * IMAGE_DOWNSCALE_STEP < IMAGE_MIN_SIDE:
+            break
+        scale *= IMAGE_DOWNSCALE_STEP
+
+    within_budget = best is not None
+    if best is None:
+        # 더 줄일 수 없으면 최저 품질로 반환 (예산 초과 표시)
+        best = (min_quality, _encode(candidate, fmt, min_quality))
+        encodes += 1
+    quality, data = best
+    return data, {
+        "format": fmt,
+        "mime": MIME_TYPES[fmt],
+        "quality": quality,
+        "width": size[0],
+        "height": size[1],
+        "bytes": len(data),
+        "encodes": encodes,
+        "within_budget": within_budget,
+    }
+
+
+def preprocess_image_budget(
+    data: Union[bytes, BinaryIO],
+    byte_budget: int = IMAGE_BYTE_BUDGET,
+    max_area: int = IMAGE_MAX_AREA,
+    fmt: str = IMAGE_FORMAT,
+) -> Tuple[bytes, Dict]:
+    """preprocess_image_bytes()의 바이트 예산 모드. (인코딩 bytes, 선택된 파라미터) 반환."""
+    img = _open_checked(data)
+    if img.format == "JPEG":
+        width, height = img.size
+        scale = min(1.0, math.sqrt(max_area / float(width * height)))
+        img.draft("RGB", (max(1, int(width * scale)), max(1, int(height * scale))))
+    return encode_to_budget(img, byte_budget, max_area, fmt)
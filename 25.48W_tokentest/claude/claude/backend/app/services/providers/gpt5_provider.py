@@ -1,6 +1,8 @@
 import base64
+import hashlib
+import json
 import os
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 
 import httpx
 
@@ -8,6 +10,70 @@ import httpx
 BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
 CHAT_COMPLETIONS_URL = f"{BASE_URL}/chat/completions"
 
+# 앱 단위 공유 HTTP client 설정 (커넥션 풀/keep-alive/단계별 timeout)
+HTTP_MAX_CONNECTIONS = int(os.getenv("OPENAI_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("OPENAI_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("OPENAI_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("OPENAI_HTTP_READ_TIMEOUT", "60"))
+HTTP_WRITE_TIMEOUT = float(os.getenv("OPENAI_HTTP_WRITE_TIMEOUT", "30"))
+HTTP_POOL_TIMEOUT = float(os.getenv("OPENAI_HTTP_POOL_TIMEOUT", "5"))
+# HTTP/2는 h2 패키지(httpx[http2])가 있을 때만 사용
+HTTP2_ENABLED = os.getenv("OPENAI_HTTP2", "").lower() in ("1", "true", "yes")
+
+try:
+    import h2  # noqa: F401
+
+    _H2_AVAILABLE = True
+except ImportError:
+    _H2_AVAILABLE = False
+
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    """설정값으로 풀링된 AsyncClient 생성 (kwargs는 테스트용 transport 등 덮어쓰기)."""
+    options = {
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(
+            connect=HTTP_CONNECT_TIMEOUT,
+            read=HTTP_READ_TIMEOUT,
+            write=HTTP_WRITE_TIMEOUT,
+            pool=HTTP_POOL_TIMEOUT,
+        ),
+        "http2": HTTP2_ENABLED and _H2_AVAILABLE,
+    }
+    options.update(kwargs)
+    return httpx.AsyncClient(**options)
+
+
+async def open_http_client(**kwargs) -> httpx.AsyncClient:
+    """앱 lifespan 시작 시 호출: 공유 client 생성."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = create_http_client(**kwargs)
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """앱 lifespan 종료 시 호출: 풀의 커넥션 정리."""
+    global _HTTP_CLIENT
+    client, _HTTP_CLIENT = _HTTP_CLIENT, None
+    if client is not None:
+        await client.aclose()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """공유 client 반환. lifespan 밖(스크립트 등)에서 호출되면 지연 생성한다."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = create_http_client()
+    return _HTTP_CLIENT
+
 
 def build_pipeline_instruction(output_mode: str = "요약") -> str:
     """
@@ -24,37 +90,56 @@ def build_pipeline_instruction(output_mode: str = "요약") -> str:
     ).format(output_mode=output_mode)
 
 
-def _encode_image_to_data_url(image_bytes: bytes) -> str:
-    """이미지 바이너리를 data URL(base64)로 변환."""
-    b64 = base64.b64encode(image_bytes).decode("utf-8")
-    return f"data:image/jpeg;base64,{b64}"
+def summary_request_key(
+    model: str,
+    instructions: str,
+    text: Optional[str],
+    image_bytes: Optional[bytes],
+) -> str:
+    """요약 요청 식별 키: sha256(model, instructions, text, 전처리된 이미지 바이트)."""
+    h = hashlib.sha256()
+    for part in (model.encode("utf-8"), instructions.encode("utf-8"), (text or "").encode("utf-8"), image_bytes or b""):
+        h.update(len(part).to_bytes(8, "big"))
+        h.update(part)
+    return h.hexdigest()
 
 
-async def call_gpt5_summary(
-    *,
+def require_api_key() -> str:
+    """OPENAI_API_KEY 확인 (없으면 RuntimeError). 스트리밍처럼 응답을 먼저 여는 경로는 시작 전에 호출."""
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if not openai_key:
+        raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다.")
+    return openai_key
+
+
+def _build_request(
     text: Optional[str],
     image_bytes: Optional[bytes],
     instructions: str,
-    model: str = "gpt-5-mini",
-) -> str:
+    model: str,
+    stream: bool = False,
+    image_mime: str = "image/jpeg",
+) -> Tuple[dict, bytes]:
     """
-    gpt-5-mini에 텍스트 + 이미지(옵션)를 전달해 요약을 받는다.
+    chat completions 요청의 (headers, JSON body bytes) 구성.
+
+    이미지는 base64 문자열/data URL str/JSON str을 따로 만들지 않고, 자리표시자로 직렬화한
+    본문 사이에 base64 바이트를 한 번에 이어 붙인다 (base64는 JSON 이스케이프가 필요 없음).
     """
-    openai_key = os.getenv("OPENAI_API_KEY")
-    if not openai_key:
-        raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다.")
+    openai_key = require_api_key()
 
     user_content: List[dict] = []
     if text:
         user_content.append({"type": "text", "text": f"input_text:\n{text}"})
 
+    # 사용자 텍스트와 겹치지 않도록 요청마다 다른 자리표시자
+    placeholder = f"__image_{os.urandom(8).hex()}__" if image_bytes else None
     if image_bytes:
-        data_url = _encode_image_to_data_url(image_bytes)
         user_content.append(
             {
                 "type": "image_url",
                 "image_url": {
-                    "url": data_url,
+                    "url": placeholder,
                 },
             }
         )
@@ -71,19 +156,80 @@ async def call_gpt5_summary(
             {"role": "user", "content": user_content},
         ],
     }
+    if stream:
+        payload["stream"] = True
+
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    if image_bytes:
+        head, tail = body.split(placeholder.encode("ascii"), 1)
+        prefix = f"data:{image_mime};base64,".encode("ascii")
+        body = b"".join((head, prefix, base64.b64encode(image_bytes), tail))
 
     headers = {
         "Authorization": f"Bearer {openai_key}",
         "Content-Type": "application/json",
     }
+    return headers, body
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(CHAT_COMPLETIONS_URL, headers=headers, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
+
+async def call_gpt5_summary(
+    *,
+    text: Optional[str],
+    image_bytes: Optional[bytes],
+    instructions: str,
+    model: str = "gpt-5-mini",
+    image_mime: str = "image/jpeg",
+) -> str:
+    """
+    gpt-5-mini에 텍스트 + 이미지(옵션)를 전달해 요약을 받는다.
+    """
+    headers, body = _build_request(text, image_bytes, instructions, model, image_mime=image_mime)
+
+    # 요청마다 client를 만들지 않고 공유 풀의 keep-alive 커넥션을 재사용
+    client = get_http_client()
+    resp = await client.post(CHAT_COMPLETIONS_URL, headers=headers, content=body)
+    resp.raise_for_status()
+    data = resp.json()
 
     try:
         return data["choices"][0]["message"]["content"]
     except Exception:
         # 응답 포맷이 예상과 다르면 원본 JSON을 반환해 디버깅에 활용
         return str(data)
+
+
+async def stream_gpt5_summary(
+    *,
+    text: Optional[str],
+    image_bytes: Optional[bytes],
+    instructions: str,
+    model: str = "gpt-5-mini",
+    image_mime: str = "image/jpeg",
+) -> AsyncIterator[str]:
+    """
+    call_gpt5_summary()의 스트리밍 버전: stream=true 로 요청하고
+    SSE로 오는 delta content 조각을 도착하는 대로 yield 한다.
+    """
+    headers, body = _build_request(
+        text, image_bytes, instructions, model, stream=True, image_mime=image_mime
+    )
+
+    client = get_http_client()
+    async with client.stream("POST", CHAT_COMPLETIONS_URL, headers=headers, content=body) as resp:
+        if resp.is_error:
+            await resp.aread()
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data)
+                delta = chunk["choices"][0].get("delta") or {}
+            except (ValueError, KeyError, IndexError):
+                continue
+            content = delta.get("content")
+            if content:
+                yield content
@@ -0,0 +1,133 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """scores에서 상위 top_k 위치 (argpartition 후 그 부분만 정렬)."""
+    k = min(top_k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.shape[0]:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(scores.shape[0])
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over L2-normalized float32 document embeddings.
+
+    - vectors live in one contiguous (n, dim) float32 matrix; a query is scored
+      with a single matrix-vector product and top-k is picked with argpartition
+    - train_ivf(nlist): optional IVF mode (k-means coarse quantizer); rows are
+      reordered by cluster so each probed list is a contiguous slice and
+      search(..., nprobe=n) only scores n lists (approximate)
+    Results are [{"id", "score"}] ready for hybrid_merge(vector_results=...).
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.ids: List[str] = []
+        self.matrix = np.empty((0, dim), dtype=np.float32)
+        self.centroids: Optional[np.ndarray] = None
+        self.list_offsets: Optional[np.ndarray] = None
+        # add()/train_ivf()마다 증가 (결과 캐시 무효화용)
+        self.version = 0
+
+    @classmethod
+    def build(cls, ids: Sequence[str], vectors: Sequence[Sequence[float]]) -> "VectorIndex":
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            raise ValueError("vectors must be a 2-D array")
+        index = cls(matrix.shape[1])
+        index.add(ids, matrix)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def is_ivf(self) -> bool:
+        return self.centroids is not None
+
+    def add(self, ids: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        rows = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(ids) != rows.shape[0]:
+            raise ValueError(f"{len(ids)} ids for {rows.shape[0]} vectors")
+        self.matrix = np.ascontiguousarray(np.vstack([self.matrix, _normalize_rows(rows)]))
+        self.ids.extend(ids)
+        # 새 행은 클러스터에 배정되지 않았으므로 IVF는 다시 학습해야 함
+        self.centroids = None
+        self.list_offsets = None
+        self.version += 1
+
+    def _query(self, query: Sequence[float]) -> np.ndarray:
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        if q.shape[0] != self.dim:
+            raise ValueError(f"query has dim {q.shape[0]}, index dim is {self.dim}")
+        norm = float(np.linalg.norm(q))
+        return q / norm if norm else q
+
+    def train_ivf(self, nlist: int, iters: int = 10, seed: int = 0) -> None:
+        """k-means(코사인)로 nlist개 리스트를 만들고 행을 클러스터 순으로 재배치."""
+        n = self.matrix.shape[0]
+        nlist = max(1, min(nlist, n))
+        rng = np.random.default_rng(seed)
+        centroids = self.matrix[rng.choice(n, size=nlist, replace=False)].copy()
+        for _ in range(iters):
+            assign = np.argmax(self.matrix @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = self.matrix[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize_rows(centroids)
+        assign = np.argmax(self.matrix @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        self.matrix = np.ascontiguousarray(self.matrix[order])
+        self.ids = [self.ids[i] for i in order]
+        counts = np.bincount(assign, minlength=nlist)
+        self.list_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.centroids = centroids.astype(np.float32)
+        self.version += 1
+
+    def _candidate_rows(self, q: np.ndarray, nprobe: int) -> np.ndarray:
+        lists = _top_k(self.centroids @ q, min(nprobe, len(self.centroids)))
+        offsets = self.list_offsets
+        return np.concatenate([np.arange(offsets[c], offsets[c + 1]) for c in lists])
+
+    def search(self, query: Sequence[float], top_k: int = 10, nprobe: Optional[int] = None) -> List[Dict]:
+        """
+        nprobe가 있고 IVF가 학습돼 있으면 근사 검색, 아니면 전체 정확 검색.
+        nprobe는 1 이상이어야 하며 리스트 수보다 크면 리스트 수로 맞춘다.
+        """
+        if nprobe is not None and nprobe < 1:
+            raise ValueError(f"nprobe must be >= 1, got {nprobe}")
+        if not self.ids:
+            return []
+        q = self._query(query)
+        if nprobe is not None and self.is_ivf:
+            rows = self._candidate_rows(q, nprobe)
+            scores = self.matrix[rows] @ q
+            best = _top_k(scores, top_k)
+            return [{"id": self.ids[rows[i]], "score": float(scores[i])} for i in best]
+        scores = self.matrix @ q
+        return [{"id": self.ids[i], "score": float(scores[i])} for i in _top_k(scores, top_k)]
+
+    def search_batch(self, queries: Sequence[Sequence[float]], top_k: int = 10) -> List[List[Dict]]:
+        """여러 쿼리를 한 번의 행렬곱 (n, dim) @ (dim, q)으로 정확 검색."""
+        if not len(queries):
+            return []
+        q = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        scores = self.matrix @ _normalize_rows(q).T
+        return [
+            [{"id": self.ids[i], "score": float(col[i])} for i in _top_k(col, top_k)]
+            for col in scores.T
+        ]
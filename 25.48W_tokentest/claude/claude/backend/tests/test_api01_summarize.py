@@ -1,7 +1,9 @@
 import io
+import json
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.api.v1 import routes
 
 
 @pytest.fixture()
@@ -10,8 +12,9 @@ def client(monkeypatch):
         return "fake-summary"
 
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    routes._SUMMARY_CACHE.clear()
     monkeypatch.setattr("app.api.v1.routes.call_gpt5_summary", fake_call_gpt5_summary)
-    monkeypatch.setattr("app.api.v1.routes.preprocess_image_bytes", lambda b: b)
+    monkeypatch.setattr("app.api.v1.routes.preprocess_image_bytes", lambda f: f.read())
     return TestClient(app)
 
 
@@ -73,3 +76,97 @@ def test_base64_encode_failure_returns_422(client, monkeypatch):
     resp = client.post("/api/v1/summarize", files=files)
     assert resp.status_code == 422
     assert "base64 encode failed" in resp.json()["detail"]
+
+
+def _sse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_relays_tokens_and_final_metadata(client, monkeypatch):
+    async def fake_stream(**kwargs):
+        for part in ["안녕", "하세요"]:
+            yield part
+
+    monkeypatch.setattr("app.api.v1.routes.stream_gpt5_summary", fake_stream)
+    resp = client.post("/api/v1/summarize/stream", data={"text": "hello", "model": "m1"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert _sse_events(resp.text) == [
+        ("token", {"delta": "안녕"}),
+        ("token", {"delta": "하세요"}),
+        ("done", {"summary": "안녕하세요", "provider": "gpt5", "model": "m1"}),
+    ]
+
+
+def test_stream_validates_before_streaming(client):
+    resp = client.post("/api/v1/summarize/stream", data={})
+    assert resp.status_code == 422
+
+
+def test_stream_missing_api_key_returns_422_before_streaming(client, monkeypatch):
+    def must_not_stream(**kwargs):
+        raise AssertionError("stream should not start")
+
+    monkeypatch.delenv("OPENAI_API_KEY")
+    monkeypatch.setattr("app.api.v1.routes.stream_gpt5_summary", must_not_stream)
+    resp = client.post("/api/v1/summarize/stream", data={"text": "hello"})
+    assert resp.status_code == 422
+    assert "OPENAI_API_KEY" in resp.json()["detail"]
+
+
+def test_stream_reports_model_failure_as_error_event(client, monkeypatch):
+    async def failing_stream(**kwargs):
+        raise RuntimeError("gpt failed")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr("app.api.v1.routes.stream_gpt5_summary", failing_stream)
+    resp = client.post("/api/v1/summarize/stream", data={"text": "hello"})
+    assert _sse_events(resp.text) == [("error", {"detail": "gpt failed"})]
+
+
+def test_oversize_upload_rejected_before_preprocess(client, monkeypatch):
+    def must_not_run(_):
+        raise AssertionError("preprocess should not run")
+
+    monkeypatch.setattr("app.api.v1.routes.IMAGE_MAX_UPLOAD_BYTES", 4)
+    monkeypatch.setattr("app.api.v1.routes.preprocess_image_bytes", must_not_run)
+    files = {"image": ("test.jpg", b"imgdata", "image/jpeg")}
+    resp = client.post("/api/v1/summarize", files=files)
+    assert resp.status_code == 413
+    assert resp.json()["detail"] == "image too large"
+
+
+def test_repeat_request_served_from_cache(client, monkeypatch):
+    calls = []
+
+    async def counting_summary(**kwargs):
+        calls.append(kwargs)
+        return f"summary-{len(calls)}"
+
+    monkeypatch.setattr("app.api.v1.routes.call_gpt5_summary", counting_summary)
+    data = {"text": "same text", "output_mode": "요약"}
+    first = client.post("/api/v1/summarize", data=data)
+    second = client.post("/api/v1/summarize", data=data)
+    assert first.headers["x-summary-cache"] == "miss"
+    assert second.headers["x-summary-cache"] == "hit"
+    assert second.json()["summary"] == "summary-1"
+    # output_mode가 바뀌면 instructions가 달라 다른 키
+    other = client.post("/api/v1/summarize", data={"text": "same text", "output_mode": "번역"})
+    assert other.json()["summary"] == "summary-2"
+    assert len(calls) == 2
+
+    refreshed = client.post("/api/v1/summarize", data=data, headers={"Cache-Control": "no-cache"})
+    assert refreshed.headers["x-summary-cache"] == "refresh"
+    assert refreshed.json()["summary"] == "summary-3"
+    assert client.post("/api/v1/summarize", data=data).json()["summary"] == "summary-3"
+
+    bypassed = client.post("/api/v1/summarize", data=data, headers={"Cache-Control": "no-store"})
+    assert bypassed.json()["summary"] == "summary-4"
+    assert client.post("/api/v1/summarize", data=data).json()["summary"] == "summary-3"
+
+    stats = client.get("/api/v1/summarize/cache-stats").json()
+    assert stats["cache"]["hits"] == 3
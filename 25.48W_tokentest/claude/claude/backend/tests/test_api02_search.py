@@ -1,10 +1,13 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.api.v1 import routes
 
 
 @pytest.fixture()
 def client(monkeypatch):
+    routes._SEARCH_CACHE.clear()
     return TestClient(app)
 
 
@@ -40,7 +43,7 @@ def test_embedding_and_hybrid_called(client, monkeypatch):
 
     def fake_embed(query, cache_get, cache_set, embed_fn):
         calls["embed"] += 1
-        return [0.0]
+        return [0.0, 0.0]
 
     def fake_hybrid(bm25, vec, **kwargs):
         calls["hybrid"] += 1
@@ -116,3 +119,109 @@ def test_limit_clamp_reflected_in_debug(client):
     assert lex_limit == 512  # from registry
     # vector_limit should be clamped to min (>= min_limit)
     assert vec_limit == 16
+
+
+def test_repeated_query_served_from_cache(client, monkeypatch):
+    calls = {"hybrid": 0}
+    real_hybrid = routes.hybrid_merge
+
+    def counting_hybrid(bm25, vec, **kwargs):
+        calls["hybrid"] += 1
+        return real_hybrid(bm25, vec, **kwargs)
+
+    monkeypatch.setattr("app.api.v1.routes.hybrid_merge", counting_hybrid)
+
+    first = client.post("/api/v1/search", json={"query": "hybrid  retrieval"})
+    second = client.post("/api/v1/search", json={"query": " hybrid retrieval "})
+    assert first.headers["X-Search-Cache"] == "miss"
+    assert second.headers["X-Search-Cache"] == "hit"
+    assert second.json() == first.json()
+    assert calls["hybrid"] == 1
+
+    # limit이 다르면 다른 키
+    other = client.post("/api/v1/search", json={"query": "hybrid retrieval", "lexical_limit": 20})
+    assert other.headers["X-Search-Cache"] == "miss"
+
+    stats = client.get("/api/v1/search/stats").json()["result_cache"]
+    assert stats["hits"] == 1
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+
+
+def test_cache_control_and_index_version_invalidation(client, monkeypatch):
+    client.post("/api/v1/search", json={"query": "embedding cache"})
+    resp = client.post("/api/v1/search", json={"query": "embedding cache"}, headers={"Cache-Control": "no-cache"})
+    assert resp.headers["X-Search-Cache"] == "refresh"
+
+    monkeypatch.setattr(routes._BM25_INDEX, "version", routes._BM25_INDEX.version + 1)
+    resp = client.post("/api/v1/search", json={"query": "embedding cache"})
+    assert resp.headers["X-Search-Cache"] == "miss"
+    resp = client.post("/api/v1/search", json={"query": "embedding cache"})
+    assert resp.headers["X-Search-Cache"] == "hit"
+
+
+def _ndjson(resp):
+    return [json.loads(line) for line in resp.text.splitlines() if line]
+
+
+def test_batch_search_streams_ndjson_in_input_order(client, monkeypatch):
+    monkeypatch.setattr(routes, "SEARCH_BATCH_CHUNK", 2)
+    embed_calls = []
+    real_embed = routes._mock_embed_batch
+
+    def counting_embed(queries):
+        embed_calls.append(list(queries))
+        return real_embed(queries)
+
+    monkeypatch.setattr("app.api.v1.routes._mock_embed_batch", counting_embed)
+    routes._EMBED_CACHE.clear()
+
+    queries = ["search ranking", "  ", "hybrid  retrieval", "embedding cache", "search ranking"]
+    resp = client.post("/api/v1/search/batch", json={"queries": queries})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = _ndjson(resp)
+    assert [line["index"] for line in lines] == [0, 1, 2, 3, 4]
+    assert lines[1] == {"index": 1, "query": "", "error": "query is required"}
+    assert "debug" not in lines[0]
+    # 청크(2개)마다 임베딩 호출 한 번, 캐시에 있으면 생략
+    assert len(embed_calls) == 2
+
+    for line in (lines[0], lines[2], lines[3]):
+        single = client.post("/api/v1/search", json={"query": line["query"]}).json()
+        assert line["results"] == single["results"]
+    assert lines[4]["results"] == lines[0]["results"]
+
+
+def test_batch_search_debug_and_validation(client):
+    resp = client.post("/api/v1/search/batch", json={"queries": ["hello"], "include_debug": True, "lexical_limit": 20})
+    line = _ndjson(resp)[0]
+    assert line["debug"]["lexical"]["limit"] == 20
+    assert "steps" in line["debug"]["vector"]
+
+    assert client.post("/api/v1/search/batch", json={"queries": []}).status_code == 422
+    assert client.post("/api/v1/search/batch", json={"queries": ["a"], "vector_model_id": "bad"}).status_code == 422
+
+
+def test_doc_store_change_invalidates_cache(client, monkeypatch, tmp_path):
+    from app.services.doc_store import default_doc_store
+
+    client.post("/api/v1/search", json={"query": "hybrid retrieval"})
+    assert client.post("/api/v1/search", json={"query": "hybrid retrieval"}).headers["X-Search-Cache"] == "hit"
+
+    docs = [dict(d, snippet=d["snippet"] + " (rebuilt)") for d in routes._DOCS]
+    monkeypatch.setattr(routes, "_DOC_STORE", default_doc_store(docs, path=str(tmp_path / "docs.bin")))
+    resp = client.post("/api/v1/search", json={"query": "hybrid retrieval"})
+    assert resp.headers["X-Search-Cache"] == "miss"
+    assert all(r["snippet"].endswith("(rebuilt)") for r in resp.json()["results"])
+
+
+def test_batch_search_rejects_non_string_queries_and_flags(client):
+    for queries in (["ok", 3], ["ok", None], [{"q": "x"}]):
+        resp = client.post("/api/v1/search/batch", json={"queries": queries})
+        assert resp.status_code == 422
+    for flag in ("false", "0", 1):
+        resp = client.post("/api/v1/search/batch", json={"queries": ["ok"], "include_debug": flag})
+        assert resp.status_code == 422
+    resp = client.post("/api/v1/search/batch", json={"queries": ["ok"], "include_debug": False})
+    assert "debug" not in _ndjson(resp)[0]
@@ -0,0 +1,79 @@
+import math
+import random
+
+from app.services.bm25 import BM25Index, tokenize
+
+
+def _brute_force(docs, query, k1=1.2, b=0.75):
+    tokenized = [tokenize(d) for d in docs]
+    n = len(docs)
+    avg = sum(len(t) for t in tokenized) / n
+    scores = []
+    for i, terms in enumerate(tokenized):
+        score = 0.0
+        for q in dict.fromkeys(tokenize(query)):
+            df = sum(1 for t in tokenized if q in t)
+            if not df:
+                continue
+            tf = terms.count(q)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(terms) / avg))
+        if score > 0:
+            scores.append((score, i))
+    scores.sort(key=lambda x: (-x[0], x[1]))
+    return scores
+
+
+def test_tokenize_handles_case_punctuation_and_hangul():
+    assert tokenize("Search, ranking! 검색 품질") == ["search", "ranking", "검색", "품질"]
+
+
+def test_scores_match_reference_bm25():
+    docs = ["search demo document", "hybrid retrieval search search", "embedding cache"]
+    index = BM25Index.build([{"id": f"d{i}", "title": t} for i, t in enumerate(docs)], fields=("title",))
+    results = index.search("search cache", top_k=10)
+    expected = _brute_force(docs, "search cache")
+    assert [r["id"] for r in results] == [f"d{i}" for _, i in expected]
+    for r, (score, _) in zip(results, expected):
+        assert math.isclose(r["score"], score)
+
+
+def test_early_termination_keeps_exact_top_k():
+    rng = random.Random(7)
+    vocab = [f"w{i}" for i in range(40)]
+    docs = [" ".join(rng.choices(vocab, weights=range(40, 0, -1), k=rng.randint(3, 30))) for _ in range(300)]
+    index = BM25Index.build([{"id": str(i), "title": d} for i, d in enumerate(docs)], fields=("title",))
+    for query in ["w0 w39 w38", "w1 w2 w3 w30", "w20 w21"]:
+        got = index.search(query, top_k=5)
+        expected = _brute_force(docs, query)[:5]
+        assert [r["id"] for r in got] == [str(i) for _, i in expected]
+
+
+def test_unknown_terms_and_version():
+    index = BM25Index.build([{"id": "a", "title": "alpha", "snippet": "beta"}])
+    assert index.search("gamma") == []
+    version = index.version
+    index.add("b", "gamma")
+    assert index.version == version + 1
+    assert index.search("gamma")[0]["id"] == "b"
+
+
+def test_search_batch_matches_search():
+    rng = random.Random(11)
+    vocab = [f"w{i}" for i in range(60)]
+    docs = [{"id": f"d{i}", "title": " ".join(rng.choices(vocab, k=rng.randint(1, 12)))} for i in range(300)]
+    index = BM25Index.build(docs, fields=("title",))
+    queries = [" ".join(rng.choices(vocab, k=rng.randint(1, 4))) for _ in range(40)] + ["", "unknown", "w1 w1"]
+
+    batch = index.search_batch(queries, top_k=7)
+
+    assert len(batch) == len(queries)
+    for query, got in zip(queries, batch):
+        assert got == index.search(query, top_k=7)
+
+
+def test_search_batch_sees_added_docs():
+    index = BM25Index.build([{"id": "a", "title": "alpha"}])
+    assert [r["id"] for r in index.search_batch(["alpha"])[0]] == ["a"]
+    index.add("b", "alpha alpha")
+    assert index.search_batch(["alpha"])[0] == index.search("alpha")
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from app.services.doc_store import DocStore, corpus_digest, default_doc_store
+
+
+DOCS = [
+    {"id": "d2", "title": "Hybrid retrieval", "snippet": "Combining BM25 and vector results."},
+    {"id": "d1", "title": "검색 데모", "snippet": "한글 스니펫 ✓"},
+    {"id": "d10", "title": "", "snippet": "empty title"},
+]
+
+
+def test_roundtrip_and_missing_ids(tmp_path):
+    path = str(tmp_path / "docs.bin")
+    DocStore.write(path, DOCS)
+    store = DocStore(path)
+
+    assert not store.is_open
+    assert store.get("d1") == {"id": "d1", "title": "검색 데모", "snippet": "한글 스니펫 ✓"}
+    assert store.is_open
+    assert store.get("d10")["title"] == ""
+    assert store.get("nope") is None
+    assert store.get("d") is None
+    assert len(store) == 3
+    assert [d["id"] if d else None for d in store.get_many(["d2", "x", "d1"])] == ["d2", None, "d1"]
+    store.close()
+    assert store.get("d2")["snippet"] == "Combining BM25 and vector results."
+
+
+def test_duplicate_ids_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        DocStore.write(str(tmp_path / "dup.bin"), [{"id": "a"}, {"id": "a"}])
+
+
+def test_bad_file_rejected(tmp_path):
+    path = tmp_path / "junk.bin"
+    path.write_bytes(b"not a store at all")
+    with pytest.raises(ValueError):
+        DocStore(str(path)).get("a")
+
+
+def test_large_store_lookups(tmp_path):
+    rng = random.Random(0)
+    docs = [{"id": f"doc-{i}", "title": f"title {i}", "snippet": "x" * rng.randrange(50)} for i in range(5000)]
+    rng.shuffle(docs)
+    path = str(tmp_path / "big.bin")
+    DocStore.write(path, docs)
+    store = DocStore(path)
+
+    for doc in rng.sample(docs, 200):
+        assert store.get(doc["id"]) == doc
+    assert store.get("doc-5000") is None
+
+
+def test_default_store_is_shared_by_content(tmp_path, monkeypatch):
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    a = default_doc_store(DOCS)
+    b = default_doc_store(DOCS)
+    c = default_doc_store(DOCS[:1])
+
+    assert a.path == b.path != c.path
+    assert len(list(tmp_path.iterdir())) == 2
+    assert b.get("d2")["title"] == "Hybrid retrieval"
+
+
+def test_explicit_missing_path_is_written(tmp_path):
+    path = str(tmp_path / "sub" / "docs.bin")
+    store = default_doc_store(DOCS, path=path)
+
+    assert store.path == path
+    assert store.get("d2")["title"] == "Hybrid retrieval"
+    assert store.digest == corpus_digest(DOCS)
+
+
+def test_stale_explicit_path_is_rewritten(tmp_path):
+    path = str(tmp_path / "docs.bin")
+    DocStore.write(path, [{"id": "d2", "title": "old title", "snippet": "old"}])
+    assert DocStore.read_digest(path) != corpus_digest(DOCS)
+
+    store = default_doc_store(DOCS, path=path)
+
+    assert store.get("d2")["title"] == "Hybrid retrieval"
+    assert store.get("d1") is not None
+    assert DocStore.read_digest(path) == corpus_digest(DOCS)
+
+
+def test_foreign_file_at_explicit_path_is_replaced(tmp_path):
+    path = tmp_path / "docs.bin"
+    path.write_bytes(b"leftover from something else")
+
+    assert default_doc_store(DOCS, path=str(path)).get("d10")["snippet"] == "empty title"
@@ -1,5 +1,13 @@
+import asyncio
+
 import pytest
-from app.services.embedding import get_query_embedding
+from app.services.embedding import (
+    EmbeddingCache,
+    EmbeddingMicroBatcher,
+    SharedEmbeddingStore,
+    get_query_embedding,
+    get_query_embeddings,
+)
 
 
 # T_M04_1: 캐시 미스 시 임베딩 API 호출 테스트
@@ -66,3 +74,118 @@ def test_rejects_empty_query():
 
     with pytest.raises(ValueError):
         get_query_embedding("   ", cache_get, cache_set, embed_fn)
+
+
+def test_embedding_cache_bounded_lru_with_stats():
+    cache = EmbeddingCache(max_bytes=2 * (120 + 2 * 32), ttl=None)
+    cache.set("a", [1.0, 2.0])
+    cache.set("b", [3.0, 4.0])
+    assert cache.get("a") == [1.0, 2.0]
+    cache.set("c", [5.0, 6.0])  # evicts b
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_shared_tier_is_reused_across_caches(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    worker1 = EmbeddingCache(max_bytes=10_000, shared=SharedEmbeddingStore(path))
+    worker2 = EmbeddingCache(max_bytes=10_000, shared=SharedEmbeddingStore(path))
+    embed_calls = []
+
+    def embed_fn(q):
+        embed_calls.append(q)
+        return [0.5, 0.25]
+
+    get_query_embedding("hello", worker1.get, worker1.set, embed_fn)
+    result = get_query_embedding("hello", worker2.get, worker2.set, embed_fn)
+    assert result == [0.5, 0.25]
+    assert embed_calls == ["hello"]
+    assert worker2.stats()["shared_hits"] == 1
+    # promoted to worker2 memory tier
+    assert worker2.memory.get("hello") == [0.5, 0.25]
+
+
+def test_shared_tier_ttl(tmp_path):
+    now = {"t": 100.0}
+    store = SharedEmbeddingStore(str(tmp_path / "e.sqlite"), ttl=10, clock=lambda: now["t"])
+    store.set("q", [1.0])
+    assert list(store.get("q")) == [1.0]
+    now["t"] += 11
+    assert store.get("q") is None
+
+
+def test_batch_embeds_only_distinct_misses_in_one_call():
+    cache = {"hit": [9.0]}
+    batch_calls = []
+
+    def embed_batch(queries):
+        batch_calls.append(list(queries))
+        return [[float(len(q))] for q in queries]
+
+    result = get_query_embeddings([" a ", "hit", "bb", "a"], cache.get, cache.__setitem__, embed_batch)
+    assert result == [[1.0], [9.0], [2.0], [1.0]]
+    assert batch_calls == [["a", "bb"]]
+    assert cache["bb"] == [2.0]
+
+    assert get_query_embeddings(["a", "hit"], cache.get, cache.__setitem__, embed_batch) == [[1.0], [9.0]]
+    assert len(batch_calls) == 1
+    with pytest.raises(ValueError):
+        get_query_embeddings(["ok", " "], cache.get, cache.__setitem__, embed_batch)
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    batch_calls = []
+
+    async def embed_batch(queries):
+        batch_calls.append(list(queries))
+        return [[float(len(q))] for q in queries]
+
+    batcher = EmbeddingMicroBatcher(embed_batch, max_batch=10, max_wait=0.01)
+
+    async def run():
+        return await asyncio.gather(*(batcher.embed(q) for q in ["a", "bb", "a", "ccc"]))
+
+    assert asyncio.run(run()) == [[1.0], [2.0], [1.0], [3.0]]
+    assert batch_calls == [["a", "bb", "ccc"]]
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["requests"] == 4
+
+
+def test_micro_batcher_flushes_at_max_batch_and_propagates_errors():
+    batch_calls = []
+
+    def embed_batch(queries):
+        batch_calls.append(list(queries))
+        if "bad" in queries:
+            raise RuntimeError("backend down")
+        return [[1.0] for _ in queries]
+
+    batcher = EmbeddingMicroBatcher(embed_batch, max_batch=2, max_wait=10)
+
+    async def run():
+        ok = await asyncio.gather(batcher.embed("x"), batcher.embed("y"))
+        failed = await asyncio.gather(batcher.embed("bad"), batcher.embed("z"), return_exceptions=True)
+        return ok, failed
+
+    ok, failed = asyncio.run(run())
+    assert ok == [[1.0], [1.0]]
+    assert all(isinstance(r, RuntimeError) for r in failed)
+    assert batch_calls == [["x", "y"], ["bad", "z"]]
+
+
+def test_all_tiers_return_identical_vectors(tmp_path):
+    # float32로 표현되지 않는 값
+    fresh = [0.1, 1 / 3, -2.718281828459045]
+    path = str(tmp_path / "e.sqlite")
+    writer = EmbeddingCache(max_bytes=10_000, shared=SharedEmbeddingStore(path))
+    reader = EmbeddingCache(max_bytes=10_000, shared=SharedEmbeddingStore(path))
+
+    computed = get_query_embedding("q", writer.get, writer.set, lambda q: fresh)
+    memory_hit = writer.get("q")
+    shared_hit = reader.get("q")
+
+    assert reader.stats()["shared_hits"] == 1
+    assert computed == memory_hit == shared_hit == fresh
+    assert type(memory_hit) is type(shared_hit) is list
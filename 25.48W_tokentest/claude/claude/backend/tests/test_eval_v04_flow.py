@@ -85,8 +85,8 @@ def test_T_M19_1_run_eval_v05_cli(monkeypatch, tmp_path):
 
 def test_T_M18_1_eval_preview_llm_mode(monkeypatch):
     # monkeypatch LLM wrappers to avoid real calls
-    monkeypatch.setattr("app.api.v1.routes.summarize_lexical", lambda text, limit, model, retries=2: "lex_llm")
-    monkeypatch.setattr("app.api.v1.routes.summarize_vector", lambda text, limit, model, retries=2: "vec_llm")
+    monkeypatch.setattr("app.api.v1.routes.summarize_lexical", lambda text, limit, model, retries=2, **kwargs: "lex_llm")
+    monkeypatch.setattr("app.api.v1.routes.summarize_vector", lambda text, limit, model, retries=2, **kwargs: "vec_llm")
 
     from app.main import app
     client = TestClient(app)
@@ -107,3 +107,65 @@ def test_T_M18_1_eval_preview_llm_mode(monkeypatch):
     assert row["vector_tokens"] > 0
     assert row["lexical_summary"] == "lex_llm"
     assert row["vector_summary"] == "vec_llm"
+
+
+def test_run_eval_v05_workers_match_serial_output(monkeypatch, tmp_path):
+    samples = [
+        {"content_id": str(i), "title": f"t{i}", "content_summary": f"문장 {i}. apple banana carrot {i}."}
+        for i in range(7)
+    ]
+    input_path = tmp_path / "data.json"
+    input_path.write_text(json.dumps(samples, ensure_ascii=False), encoding="utf-8")
+
+    outputs = {}
+    for workers in ("1", "2"):
+        out_csv = tmp_path / f"out_{workers}.csv"
+        out_md = tmp_path / f"out_{workers}.md"
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "run_eval_v05",
+                "--input",
+                str(input_path),
+                "--output-csv",
+                str(out_csv),
+                "--output-md",
+                str(out_md),
+                "--batch-size",
+                "2",
+                "--workers",
+                workers,
+            ],
+        )
+        run_main_v05()
+        outputs[workers] = (out_csv.read_text(), out_md.read_text())
+
+    assert outputs["1"] == outputs["2"]
+    assert outputs["2"][0].count("\n") == len(samples) + 1
+
+
+@pytest.mark.parametrize("bad_input", ["missing", "schema"])
+def test_bad_input_keeps_existing_reports(monkeypatch, tmp_path, bad_input):
+    out_csv = tmp_path / "out.csv"
+    out_md = tmp_path / "out.md"
+    out_csv.write_text("previous csv", encoding="utf-8")
+    out_md.write_text("previous md", encoding="utf-8")
+
+    input_path = tmp_path / "data.json"
+    if bad_input == "schema":
+        good = {"content_id": "1", "title": "t1", "content_summary": "apple banana"}
+        input_path.write_text(json.dumps([good, {"content_id": "2"}]), encoding="utf-8")
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["run_eval_v04", "--input", str(input_path), "--output-csv", str(out_csv), "--output-md", str(out_md)],
+    )
+    with pytest.raises(ValueError):
+        run_main()
+
+    assert out_csv.read_text(encoding="utf-8") == "previous csv"
+    assert out_md.read_text(encoding="utf-8") == "previous md"
+    # 임시 파일도 남지 않음
+    assert not list(tmp_path.glob("*.tmp"))
@@ -1,7 +1,7 @@
 import json
 import pytest
 
-from app.eval.loader_v04 import load_content_summaries
+from app.eval.loader_v04 import _iter_json_array, iter_content_summaries, load_content_summaries
 
 
 def test_T_M10_1_loads_json_and_validates_schema(tmp_path):
@@ -23,3 +23,59 @@ def test_T_M10_2_missing_required_field_raises(tmp_path):
 
     with pytest.raises(ValueError):
         load_content_summaries(str(path))
+
+
+def test_streams_json_array_across_read_chunks(tmp_path):
+    doc = [{"content_id": str(i), "title": f"t{i}", "content_summary": "요약 " * i, "n": 12345} for i in range(50)]
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(doc, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    with path.open("r", encoding="utf-8") as f:
+        streamed = list(_iter_json_array(f, chunk_chars=7))
+    assert streamed == doc
+    assert list(iter_content_summaries(str(path))) == doc
+
+
+def test_streams_jsonl_and_reports_row_index(tmp_path):
+    lines = [
+        json.dumps({"content_id": "c1", "title": "t1", "content_summary": "s1"}),
+        "",
+        json.dumps({"content_id": "c2", "title": "t2"}),
+    ]
+    path = tmp_path / "data.jsonl"
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+    items = iter_content_summaries(str(path))
+    assert next(items)["content_id"] == "c1"
+    with pytest.raises(ValueError, match="at index 1"):
+        next(items)
+
+
+def test_non_list_root_raises(tmp_path):
+    path = tmp_path / "obj.json"
+    path.write_text(json.dumps({"content_id": "c1"}), encoding="utf-8")
+    with pytest.raises(ValueError, match="root must be a list"):
+        load_content_summaries(str(path))
+
+
+class _CountingReader:
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+
+    def read(self, n):
+        chunk = self.text[self.pos : self.pos + n]
+        self.pos += len(chunk)
+        return chunk
+
+
+def test_malformed_element_fails_fast_with_index():
+    good = json.dumps({"content_id": "c", "title": "t", "content_summary": "s"})
+    tail = ",".join([good] * 5000)
+    reader = _CountingReader("[" + good + ', {"content_id": "c2" "title": "t"}, ' + tail + "]")
+
+    items = _iter_json_array(reader, chunk_chars=256)
+    assert next(items)["content_id"] == "c"
+    with pytest.raises(ValueError, match="invalid JSON at index 1"):
+        next(items)
+    assert reader.pos < 1024
@@ -1,9 +1,16 @@
 import pytest
 
+from app.eval import metrics_v04
 from app.eval.metrics_v04 import (
+    METRICS_CACHE,
+    clear_metrics_cache,
     token_count_tiktoken,
+    token_count_batch,
     extract_keywords,
     keyword_coverage,
+    token_bounds,
+    token_count_bounded,
+    within_token_limit,
 )
 
 
@@ -32,3 +39,47 @@ def test_T_M13_1_keyword_coverage_basic():
     assert pytest.approx(cov, rel=1e-6) == 2 / 3
 
     assert keyword_coverage("", "anything") == 0.0
+
+
+def test_token_count_batch_matches_single_counts():
+    texts = ["hello", "", "hello world", None, "apple banana carrot"]
+    counts = token_count_batch(texts, num_threads=2)
+    assert counts == [token_count_tiktoken(t) for t in texts]
+    assert token_count_batch([]) == []
+
+
+def test_metrics_cache_hits_on_repeated_text():
+    clear_metrics_cache()
+    text = "반복 호출되는 원문 apple banana"
+    first = token_count_tiktoken(text)
+    kws = extract_keywords(text)
+    assert token_count_tiktoken(text) == first
+    assert token_count_batch([text, text]) == [first, first]
+    assert extract_keywords(text) == kws
+    stats = METRICS_CACHE.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 4
+    clear_metrics_cache()
+    assert METRICS_CACHE.stats()["entries"] == 0
+
+
+def test_token_bounds_bracket_pretokenizer_pieces():
+    assert token_bounds("") == (0, 0)
+    assert token_bounds("hello world.") == (3, 12)
+    lower, upper = token_bounds("2024년 12월 3일에 발표했다.")
+    assert lower == 9
+    assert upper == len("2024년 12월 3일에 발표했다.".encode("utf-8"))
+
+
+def test_token_count_bounded_skips_encoding_far_from_limit(monkeypatch):
+    monkeypatch.setattr(metrics_v04, "TOKEN_BOUNDS_ENABLED", True)
+
+    def no_encoding():
+        raise AssertionError("exact encoding should be skipped")
+
+    monkeypatch.setattr(metrics_v04, "_get_encoding", no_encoding)
+    clear_metrics_cache()
+    assert within_token_limit("짧은 문장.", 128)
+    assert not within_token_limit("단어 " * 200, 128)
+    lower, upper = token_count_bounded("단어 " * 200, 128)
+    assert lower > 128
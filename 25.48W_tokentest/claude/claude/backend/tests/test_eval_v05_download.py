@@ -22,8 +22,8 @@ def test_download_heuristic_success(monkeypatch):
 
 
 def test_download_llm_mode_with_monkeypatch(monkeypatch):
-    monkeypatch.setattr("app.api.v1.routes.summarize_lexical", lambda text, limit, model: "lex_llm")
-    monkeypatch.setattr("app.api.v1.routes.summarize_vector", lambda text, limit, model: "vec_llm")
+    monkeypatch.setattr("app.api.v1.routes.summarize_lexical", lambda text, limit, model, **kwargs: "lex_llm")
+    monkeypatch.setattr("app.api.v1.routes.summarize_vector", lambda text, limit, model, **kwargs: "vec_llm")
     client = TestClient(app)
     resp = client.post(
         "/api/v1/eval/download",
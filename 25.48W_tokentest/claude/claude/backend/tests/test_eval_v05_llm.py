@@ -1,4 +1,18 @@
-from app.eval.llm_v05 import summarize_lexical, summarize_vector
+import asyncio
+
+from app.eval import llm_v05
+from app.eval.llm_v05 import (
+    AIMDController,
+    LLMRateLimited,
+    RateLimiter,
+    backoff_delay,
+    classify_error,
+    summarize_batch_async,
+    summarize_lexical,
+    summarize_lexical_async,
+    summarize_vector,
+    summarize_vector_async,
+)
 
 
 def test_lexical_prompt_contains_limit_and_style():
@@ -39,3 +53,259 @@ def test_retry_then_success():
     out = summarize_lexical("text", limit=10, model="m3", retries=3, client=client)
     assert out == "done"
     assert len(calls) == 2
+
+
+def test_batch_async_keeps_order_and_caps_concurrency():
+    active = {"now": 0, "max": 0}
+
+    async def client(prompt, model):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return prompt.rsplit("\n", 1)[-1] + ("|lex" if "mode: lexical" in prompt else "|vec")
+
+    texts = [f"text{i}" for i in range(6)]
+    pairs = asyncio.run(summarize_batch_async(texts, 50, 60, "m1", client=client, concurrency=3))
+    assert pairs == [(f"text{i}|lex", f"text{i}|vec") for i in range(6)]
+    assert active["max"] == 3
+
+
+def test_batch_async_runs_sync_calls_and_async_variant_retries():
+    pairs = asyncio.run(
+        summarize_batch_async(
+            ["a", "b"], 10, 10, lexical_call=lambda t: t.upper(), vector_call=lambda t: t * 2
+        )
+    )
+    assert pairs == [("A", "aa"), ("B", "bb")]
+
+    def failing(prompt, model):
+        raise RuntimeError("fail")
+
+    out, meta = asyncio.run(summarize_vector_async("t", 10, "m", retries=2, client=failing, return_meta=True))
+    assert out == "SUMMARY_FAIL"
+    assert meta["attempts"] == 2
+
+
+def test_rate_limiter_waits_for_window():
+    now = {"t": 0.0}
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now["t"] += seconds
+
+    limiter = RateLimiter(rpm=2, tpm=100, clock=lambda: now["t"], sleep=fake_sleep)
+
+    async def run():
+        await limiter.acquire(40)
+        await limiter.acquire(40)
+        await limiter.acquire(40)  # rpm exhausted → wait a full window
+
+    asyncio.run(run())
+    assert sleeps == [60.0]
+
+
+class _Response:
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"http {status_code}")
+        self.response = _Response(status_code, headers or {})
+
+
+def test_classify_error_detects_rate_limit_and_retry_after():
+    assert classify_error(LLMRateLimited(retry_after=3)) == (True, 3)
+    assert classify_error(_HTTPError(429, {"retry-after": "7"})) == (True, 7.0)
+    assert classify_error(_HTTPError(500)) == (False, None)
+    assert classify_error(RuntimeError("boom")) == (False, None)
+
+
+def test_backoff_delay_is_capped_and_honours_retry_after():
+    for attempt in range(1, 10):
+        assert 0 <= backoff_delay(attempt, base_delay=0.5, max_delay=4) <= min(4, 0.5 * 2 ** (attempt - 1))
+    assert backoff_delay(1, retry_after=3, base_delay=0.5, max_delay=4) == 3
+
+
+def test_backoff_delay_clamps_huge_retry_after(monkeypatch):
+    assert backoff_delay(1, retry_after=86400, base_delay=0.5, max_delay=4) == 4
+    monkeypatch.setattr(llm_v05, "LLM_RETRY_MAX_DELAY", 30.0)
+    assert backoff_delay(2, retry_after=86400) == 30.0
+
+
+def test_retry_backs_off_and_records_attempt_timings(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(llm_v05, "_sleep", sleeps.append)
+    calls = []
+
+    def client(prompt, model):
+        calls.append(prompt)
+        if len(calls) == 1:
+            raise _HTTPError(429, {"retry-after": "2"})
+        if len(calls) == 2:
+            raise RuntimeError("temp")
+        return "done"
+
+    out, meta = summarize_lexical("text", limit=10, model="m", retries=3, client=client, return_meta=True)
+    assert out == "done"
+    assert meta["attempts"] == 3
+    assert meta["rate_limited"] == 1
+    assert len(sleeps) == 2 and sleeps[0] >= 2
+    assert [t["rate_limited"] for t in meta["attempt_timings"]] == [True, False, False]
+    assert meta["attempt_timings"][-1]["error"] is None
+    assert all(t["elapsed"] >= 0 for t in meta["attempt_timings"])
+
+
+def test_no_backoff_after_final_attempt(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(llm_v05, "_sleep", sleeps.append)
+
+    def client(prompt, model):
+        raise RuntimeError("fail")
+
+    assert summarize_vector("text", limit=5, model="m", retries=2, client=client) == "SUMMARY_FAIL"
+    assert len(sleeps) == 1
+
+
+def test_aimd_controller_shrinks_on_throttle_and_grows_on_success():
+    now = {"t": 0.0}
+    c = AIMDController(initial=8, min_limit=1, max_limit=8, cooldown=1.0, clock=lambda: now["t"])
+    c.on_throttle()
+    assert c.limit == 4
+    c.on_throttle()  # same cooldown window → counted once
+    assert c.limit == 4
+    now["t"] = 2.0
+    c.on_throttle()
+    assert c.limit == 2
+    for _ in range(10):
+        c.on_success()
+    assert c.limit > 2
+
+    assert c.try_acquire() and c.try_acquire()
+    c2 = AIMDController(initial=1, max_limit=1)
+    assert c2.try_acquire() and not c2.try_acquire()
+    c2.release()
+    assert c2.try_acquire()
+
+
+def test_batch_async_shares_controller_across_calls(monkeypatch):
+    async def no_sleep(seconds):
+        return None
+
+    monkeypatch.setattr(llm_v05, "_async_sleep", no_sleep)
+    seen = {"throttled": False, "active": 0, "max": 0}
+    controller = AIMDController(initial=4, max_limit=4, cooldown=0)
+
+    async def client(prompt, model):
+        seen["active"] += 1
+        seen["max"] = max(seen["max"], seen["active"])
+        await asyncio.sleep(0)
+        seen["active"] -= 1
+        if not seen["throttled"]:
+            seen["throttled"] = True
+            raise LLMRateLimited()
+        return "ok"
+
+    pairs = asyncio.run(
+        summarize_batch_async(["a", "b", "c"], 10, 10, client=client, concurrency=8, controller=controller)
+    )
+    assert pairs == [("ok", "ok")] * 3
+    assert seen["max"] <= 4
+    assert controller.in_flight == 0
+
+
+def test_controller_slot_released_on_cancel():
+    controller = AIMDController(initial=1, max_limit=1)
+
+    async def client(prompt, model):
+        await asyncio.sleep(10)
+        return "late"
+
+    async def run():
+        task = asyncio.create_task(summarize_lexical_async("t", 5, "m", client=client, controller=controller))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    assert controller.in_flight == 0
+    assert controller.try_acquire()
+
+
+def test_acquire_async_wakes_on_release_from_other_thread():
+    import threading
+
+    controller = AIMDController(initial=1, max_limit=1)
+    assert controller.try_acquire()
+
+    async def run():
+        threading.Timer(0.02, controller.release).start()
+        await asyncio.wait_for(controller.acquire_async(), timeout=2)
+
+    asyncio.run(run())
+    assert controller.in_flight == 1
+
+
+def _windowed_limiter(rpm, sleeps):
+    now = {"t": 0.0}
+
+    def sync_sleep(seconds):
+        sleeps.append(seconds)
+        now["t"] += seconds
+
+    async def async_sleep(seconds):
+        sync_sleep(seconds)
+
+    return RateLimiter(rpm=rpm, clock=lambda: now["t"], sleep=async_sleep, sync_sleep=sync_sleep)
+
+
+def _flaky_client(failures):
+    calls = []
+
+    def client(prompt, model):
+        calls.append(prompt)
+        if len(calls) <= failures:
+            raise _HTTPError(429)
+        return "ok"
+
+    return client, calls
+
+
+def test_retries_count_against_rate_limiter(monkeypatch):
+    monkeypatch.setattr(llm_v05, "_sleep", lambda s: None)
+    limiter_sleeps = []
+    limiter = _windowed_limiter(rpm=2, sleeps=limiter_sleeps)
+    client, calls = _flaky_client(failures=2)
+
+    out = summarize_lexical("t", 10, "m", retries=3, client=client, limiter=limiter)
+
+    assert out == "ok"
+    assert len(calls) == 3
+    # 세 번째 시도는 rpm=2 윈도우가 비기를 기다림
+    assert limiter_sleeps == [60.0]
+
+
+def test_async_retries_count_against_rate_limiter(monkeypatch):
+    async def no_sleep(seconds):
+        return None
+
+    monkeypatch.setattr(llm_v05, "_async_sleep", no_sleep)
+    limiter_sleeps = []
+    limiter = _windowed_limiter(rpm=2, sleeps=limiter_sleeps)
+    client, calls = _flaky_client(failures=2)
+
+    pairs = asyncio.run(
+        summarize_batch_async(["t"], 10, 10, retries=3, client=client, limiter=limiter, concurrency=1)
+    )
+
+    # lexical 3번 시도 (429 두 번) + vector 1번 = 4번 요청 → rpm=2 윈도우를 한 번 기다림
+    assert pairs == [("ok", "ok")]
+    assert len(calls) == 4
+    assert limiter_sleeps == [60.0]
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.eval.llm_cache_v05 import LLMResponseCache, cache_key, cached_client, client_identity
+from app.eval.llm_v05 import summarize_lexical, summarize_batch_async
+
+
+def test_cached_client_skips_repeat_calls(tmp_path):
+    calls = []
+
+    def client(prompt, model):
+        calls.append((prompt, model))
+        return f"summary-{len(calls)}"
+
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite"))
+    wrapped = cached_client(client, cache, client_id="test-client")
+
+    first = summarize_lexical("hello", limit=50, model="m1", client=wrapped)
+    second = summarize_lexical("hello", limit=50, model="m1", client=wrapped)
+    other = summarize_lexical("hello", limit=60, model="m1", client=wrapped)
+    assert first == second == "summary-1"
+    assert other == "summary-2"
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 1
+
+    # persistent across instances
+    cache.close()
+    reopened = LLMResponseCache(str(tmp_path / "llm.sqlite"))
+    again = summarize_lexical("hello", limit=50, model="m1", client=cached_client(client, reopened, client_id="test-client"))
+    assert again == "summary-1"
+    assert len(calls) == 2
+
+
+def test_ttl_expiry_size_eviction_and_bypass(tmp_path):
+    now = {"t": 1000.0}
+    cache = LLMResponseCache(str(tmp_path / "c.sqlite"), ttl=10, max_bytes=10, clock=lambda: now["t"])
+    cache.set("a", "12345")
+    now["t"] += 1
+    cache.set("b", "12345")
+    now["t"] += 1
+    cache.get("a")  # a is now most recently used
+    cache.set("c", "12345")  # over budget → evict b
+    assert cache.get("b") is None
+    assert cache.get("a") == "12345"
+    assert cache.stats()["evictions"] == 1
+
+    now["t"] += 100
+    assert cache.get("a") is None
+    assert cache.stats()["expired"] == 1
+
+    def client(prompt, model):
+        return "fresh"
+
+    assert cached_client(client, cache, bypass=True) is client
+    assert cache_key("p", "m", "x") != cache_key("p", "m", "y")
+
+
+def test_cached_async_client(tmp_path):
+    calls = []
+
+    async def client(prompt, model):
+        calls.append(prompt)
+        return "async-summary"
+
+    wrapped = cached_client(client, LLMResponseCache(str(tmp_path / "a.sqlite")), client_id="async-client")
+    pairs = asyncio.run(summarize_batch_async(["x", "x"], 10, 10, "m", client=wrapped, concurrency=1))
+    assert pairs == [("async-summary", "async-summary")] * 2
+    assert len(calls) == 2  # one lexical + one vector prompt
+
+
+def test_lambda_clients_need_explicit_client_id(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "l.sqlite"))
+    with pytest.raises(ValueError, match="client_id is required"):
+        cached_client(lambda prompt, model: "x", cache)
+    assert cached_client(lambda prompt, model: "x", cache, client_id="fixed").client_id == "fixed"
+    assert client_identity(client_identity) == "app.eval.llm_cache_v05.client_identity"
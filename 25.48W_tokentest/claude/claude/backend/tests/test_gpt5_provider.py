@@ -0,0 +1,100 @@
+import asyncio
+import base64
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.providers import gpt5_provider
+
+
+def _completion(content):
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def test_calls_reuse_shared_client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers["authorization"])
+        return httpx.Response(200, json=_completion("ok"))
+
+    async def run():
+        client = await gpt5_provider.open_http_client(transport=httpx.MockTransport(handler))
+        try:
+            first = await gpt5_provider.call_gpt5_summary(text="a", image_bytes=None, instructions="i")
+            second = await gpt5_provider.call_gpt5_summary(text="b", image_bytes=None, instructions="i")
+            assert gpt5_provider.get_http_client() is client
+            return first, second
+        finally:
+            await gpt5_provider.close_http_client()
+
+    assert asyncio.run(run()) == ("ok", "ok")
+    assert seen == ["Bearer test-key"] * 2
+    assert gpt5_provider._HTTP_CLIENT is None
+
+
+def test_client_limits_and_timeouts_from_config():
+    client = gpt5_provider.create_http_client()
+    try:
+        assert client.timeout.connect == gpt5_provider.HTTP_CONNECT_TIMEOUT
+        assert client.timeout.read == gpt5_provider.HTTP_READ_TIMEOUT
+    finally:
+        asyncio.run(client.aclose())
+
+
+def test_app_lifespan_opens_and_closes_client():
+    with TestClient(app):
+        client = gpt5_provider._HTTP_CLIENT
+        assert client is not None and not client.is_closed
+    assert gpt5_provider._HTTP_CLIENT is None
+    assert client.is_closed
+
+
+def test_stream_yields_delta_content(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        lines = [
+            'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+            'data: {"choices": [{"delta": {"content": "요약"}}]}',
+            ": keep-alive",
+            'data: {"choices": [{"delta": {"content": " 결과"}}]}',
+            "data: [DONE]",
+        ]
+        return httpx.Response(200, text="\n\n".join(lines) + "\n\n", headers={"content-type": "text/event-stream"})
+
+    async def run():
+        await gpt5_provider.open_http_client(transport=httpx.MockTransport(handler))
+        try:
+            return [
+                part
+                async for part in gpt5_provider.stream_gpt5_summary(text="a", image_bytes=None, instructions="i")
+            ]
+        finally:
+            await gpt5_provider.close_http_client()
+
+    assert asyncio.run(run()) == ["요약", " 결과"]
+    assert bodies[0]["stream"] is True
+
+
+def test_request_body_embeds_image_data_url(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    image = bytes(range(256)) * 4
+    _, body = gpt5_provider._build_request('text with "quotes"', image, "inst", "m")
+    payload = json.loads(body)
+    content = payload["messages"][1]["content"]
+    assert content[0]["text"] == 'input_text:\ntext with "quotes"'
+    assert content[1]["image_url"]["url"] == "data:image/jpeg;base64," + base64.b64encode(image).decode("ascii")
+    assert "stream" not in payload
+
+
+def test_request_body_uses_image_mime(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    _, body = gpt5_provider._build_request(None, b"webp-bytes", "inst", "m", image_mime="image/webp")
+    url = json.loads(body)["messages"][1]["content"][0]["image_url"]["url"]
+    assert url.startswith("data:image/webp;base64,")
@@ -34,3 +34,86 @@ def test_weights_change_ordering():
 
     assert merged[0]["id"] == "b"
     assert merged[1]["id"] == "a"
+
+
+def test_unknown_method_raises():
+    import pytest
+
+    with pytest.raises(ValueError):
+        hybrid_merge([], [], method="nope")
+
+
+def test_rrf_uses_ranks_not_raw_scores():
+    bm25 = [{"id": "a", "score": 100.0}, {"id": "b", "score": 50.0}]
+    vec = [{"id": "b", "score": 0.9}, {"id": "a", "score": 0.1}, {"id": "c", "score": 0.05}]
+
+    merged = hybrid_merge(bm25, vec, method="rrf")
+
+    assert {m["id"] for m in merged[:2]} == {"a", "b"}
+    assert merged[0]["score"] == merged[1]["score"] == 0.5 / 61 + 0.5 / 62
+    assert merged[2] == {"id": "c", "bm25_score": 0.0, "vector_score": 0.05, "score": 0.5 / 63}
+
+
+def test_minmax_stops_bm25_scale_from_dominating():
+    bm25 = [{"id": "a", "score": 12.0}, {"id": "b", "score": 10.0}]
+    vec = [{"id": "a", "score": 0.1}, {"id": "b", "score": 0.9}]
+
+    assert hybrid_merge(bm25, vec)[0]["id"] == "a"
+    merged = hybrid_merge(bm25, vec, bm25_weight=0.4, vector_weight=0.6, method="minmax")
+    assert merged[0]["id"] == "b"
+    assert merged[0]["score"] == 0.6
+    assert merged[0]["bm25_score"] == 10.0
+
+
+def test_zscore_missing_leg_gets_lowest_value():
+    bm25 = [{"id": "a", "score": 3.0}, {"id": "b", "score": 1.0}]
+    vec = [{"id": "c", "score": 0.5}]
+
+    merged = hybrid_merge(bm25, vec, method="zscore")
+    by_id = {m["id"]: m["score"] for m in merged}
+
+    assert by_id["a"] == 0.5 * 1.0 + 0.5 * 0.0
+    assert by_id["b"] == 0.5 * -1.0
+    assert by_id["c"] == 0.5 * -1.0
+
+
+def test_numpy_path_matches_python_path(monkeypatch):
+    import random
+
+    import pytest
+
+    from app.services import hybrid
+
+    rng = random.Random(3)
+    bm25 = [{"id": f"d{rng.randrange(3000)}", "score": rng.uniform(0, 20)} for _ in range(2000)]
+    vec = [{"id": f"d{rng.randrange(3000)}", "score": rng.uniform(-1, 1)} for _ in range(2000)]
+    # 동점 처리 확인용
+    bm25 += [{"id": "tie1", "score": 50.0}, {"id": "tie2", "score": 50.0}]
+
+    for method in hybrid.FUSION_METHODS:
+        monkeypatch.setattr(hybrid, "HYBRID_NUMPY_MIN", 10**9)
+        expected = hybrid_merge(bm25, vec, top_k=25, method=method)
+        monkeypatch.setattr(hybrid, "HYBRID_NUMPY_MIN", 0)
+        got = hybrid_merge(bm25, vec, top_k=25, method=method)
+        assert [g["id"] for g in got] == [e["id"] for e in expected]
+        assert [g["score"] for g in got] == pytest.approx([e["score"] for e in expected])
+
+
+def test_numpy_path_matches_python_path_with_ties(monkeypatch):
+    import random
+
+    from app.services import hybrid
+
+    rng = random.Random(7)
+    for case in range(100):
+        # 적은 점수 종류 → k번째 자리에 동점이 많음
+        levels = [0.0, 0.25, 0.5, 1.0, 2.0]
+        bm25 = [{"id": f"d{rng.randrange(60)}", "score": rng.choice(levels)} for _ in range(rng.randint(0, 50))]
+        vec = [{"id": f"d{rng.randrange(60)}", "score": rng.choice(levels)} for _ in range(rng.randint(0, 50))]
+        top_k = rng.randint(1, 15)
+        for method in hybrid.FUSION_METHODS:
+            monkeypatch.setattr(hybrid, "HYBRID_NUMPY_MIN", 10**9)
+            expected = hybrid_merge(bm25, vec, top_k=top_k, method=method)
+            monkeypatch.setattr(hybrid, "HYBRID_NUMPY_MIN", 0)
+            got = hybrid_merge(bm25, vec, top_k=top_k, method=method)
+            assert got == expected, (case, method)
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from io import BytesIO
+
+import pytest
+from PIL import Image, JpegImagePlugin
+
+from app.services import image_utils
+from app.services.image_utils import (
+    encode_to_budget,
+    preprocess_image_budget,
+    preprocess_image_bytes,
+    run_in_image_pool,
+)
+
+
+def _jpeg(size, mode="RGB"):
+    buf = BytesIO()
+    Image.new(mode, size, color=(200, 10, 10) if mode == "RGB" else 128).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _png(size):
+    buf = BytesIO()
+    Image.new("RGBA", size, color=(0, 0, 255, 128)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_large_jpeg_uses_draft_decode(monkeypatch):
+    drafts = []
+    original = JpegImagePlugin.JpegImageFile.draft
+
+    def spy(self, mode, size):
+        result = original(self, mode, size)
+        drafts.append((mode, size, self.size))
+        return result
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", spy)
+    out = Image.open(BytesIO(preprocess_image_bytes(_jpeg((4000, 3000)))))
+    assert max(out.size) == 1024
+    assert out.format == "JPEG"
+    # 4000x3000 → 1/2 스케일(2000x1500)로 디코드
+    assert drafts[0] == ("RGB", (1024, 1024), (2000, 1500))
+
+
+def test_non_jpeg_is_converted_without_draft():
+    out = Image.open(BytesIO(preprocess_image_bytes(_png((300, 200)))))
+    assert out.size == (300, 200)
+    assert out.mode == "RGB"
+
+
+def test_preprocess_runs_in_image_pool():
+    async def run():
+        name = await run_in_image_pool(lambda: threading.current_thread().name)
+        data = await run_in_image_pool(preprocess_image_bytes, _jpeg((2048, 1024)))
+        return name, data
+
+    name, data = asyncio.run(run())
+    assert name.startswith("image")
+    assert Image.open(BytesIO(data)).size == (1024, 512)
+    image_utils.shutdown_image_executor()
+
+
+def test_rejects_too_many_pixels_before_decode(monkeypatch):
+    monkeypatch.setattr(image_utils, "IMAGE_MAX_PIXELS", 100)
+    with pytest.raises(image_utils.ImageTooLarge):
+        preprocess_image_bytes(BytesIO(_jpeg((20, 20))))
+
+
+def _noisy_jpeg(size, exif=True):
+    import random
+
+    rng = random.Random(0)
+    img = Image.frombytes("RGB", size, bytes(rng.getrandbits(8) for _ in range(size[0] * size[1] * 3)))
+    buf = BytesIO()
+    kwargs = {}
+    if exif:
+        exif_data = Image.Exif()
+        exif_data[0x010F] = "camera-maker"
+        kwargs["exif"] = exif_data.tobytes()
+    img.save(buf, format="JPEG", quality=95, **kwargs)
+    return buf.getvalue()
+
+
+def test_budget_encoding_fits_budget_and_area_and_strips_metadata():
+    data, params = preprocess_image_budget(_noisy_jpeg((600, 400)), byte_budget=30_000, max_area=200 * 200)
+    assert len(data) <= 30_000
+    assert params["within_budget"] is True
+    assert params["width"] * params["height"] <= 200 * 200
+    assert params["bytes"] == len(data)
+    assert 40 <= params["quality"] <= 90
+    out = Image.open(BytesIO(data))
+    assert out.size == (params["width"], params["height"])
+    assert not out.getexif()
+
+
+def test_budget_encoding_picks_highest_quality_that_fits():
+    img = Image.open(BytesIO(_noisy_jpeg((128, 128), exif=False)))
+    generous, p1 = encode_to_budget(img, byte_budget=10_000_000, max_area=128 * 128)
+    assert p1["quality"] == 90
+    tight, p2 = encode_to_budget(img, byte_budget=len(generous) // 2, max_area=128 * 128)
+    assert p2["quality"] < 90 or p2["width"] < 128
+
+
+def test_budget_encoding_downscales_then_webp():
+    img = Image.open(BytesIO(_noisy_jpeg((400, 400), exif=False)))
+    data, params = encode_to_budget(img, byte_budget=4_000, max_area=400 * 400)
+    assert params["width"] < 400 and len(data) <= 4_000
+    webp, wparams = encode_to_budget(img, byte_budget=50_000, max_area=400 * 400, fmt="webp")
+    assert wparams["format"] in ("WEBP", "JPEG")
+    assert Image.open(BytesIO(webp)).format == wparams["format"]
+    assert wparams["mime"] == {"WEBP": "image/webp", "JPEG": "image/jpeg"}[wparams["format"]]
@@ -1,5 +1,5 @@
 import pytest
-from app.core.token_utils import enforce_token_limit
+from app.core.token_utils import enforce_token_limit, token_count
 
 
 def test_returns_text_when_under_limit():
@@ -50,3 +50,21 @@ def test_calls_shorten_twice_when_still_over_after_first_pass():
     result = enforce_token_limit(text, limit=5, shorten_fn=shorten_fn, counter_fn=counter_fn)
     assert result == "shortened twice"
     assert calls == [(text, False), ("shortened once", True)]
+
+
+def test_limit_aware_shorten_fn_runs_single_pass():
+    text = "this text is too long"
+    calls = []
+
+    def shorten_fn(t, aggressive):
+        raise AssertionError("ratio passes should be skipped")
+
+    def to_limit(t, limit, counter_fn):
+        calls.append((t, limit, counter_fn))
+        return "fits"
+
+    shorten_fn.to_limit = to_limit
+
+    result = enforce_token_limit(text, limit=3, shorten_fn=shorten_fn)
+    assert result == "fits"
+    assert calls == [(text, 3, token_count)]
@@ -1,4 +1,5 @@
 from app.core.summarizer import make_shorten_fn
+from app.eval.metrics_v04 import token_count_tiktoken
 
 
 def test_make_shorten_fn_lexical_trims_front():
@@ -18,3 +19,23 @@ def test_make_shorten_fn_vector_trims_back():
     assert out.endswith("six")
     out_aggr = fn("one two three four five six", aggressive=True)
     assert len(out_aggr.split()) <= len(out.split())
+
+
+def test_to_limit_picks_longest_run_in_one_pass():
+    text = "one two. three four. five six seven"
+    lex = make_shorten_fn("lexical_v1", "lexical")
+    vec = make_shorten_fn("vector_v1", "vector")
+    front = token_count_tiktoken("one two.") + token_count_tiktoken("three four.")
+    back = token_count_tiktoken("three four.") + token_count_tiktoken("five six seven")
+    assert lex.to_limit(text, front) == "one two. three four."
+    assert vec.to_limit(text, back) == "three four. five six seven"
+    assert lex.to_limit(text, 100) == text
+    assert lex.to_limit("", 10) == ""
+
+
+def test_to_limit_budgets_in_counter_fn_units():
+    text = "aaaa bbbb. cc. dddddd"
+    lex = make_shorten_fn("lexical_v1", "lexical")
+    # 문자 수 기준 budget: "aaaa bbbb." (10) + "cc." (3)
+    assert lex.to_limit(text, 13, len) == "aaaa bbbb. cc."
+    assert lex.to_limit(text, 12, len) == "aaaa bbbb."
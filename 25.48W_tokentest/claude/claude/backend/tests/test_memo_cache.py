@@ -0,0 +1,59 @@
+from app.core.memo_cache import MemoCache, content_key
+
+
+def test_content_key_is_namespaced_hash():
+    assert content_key("tok", "hello") == content_key("tok", "hello")
+    assert content_key("tok", "hello") != content_key("kw", "hello")
+    assert content_key("tok", "hello") != content_key("tok", "hello!")
+
+
+def test_lru_eviction_under_byte_budget():
+    cache = MemoCache(max_bytes=3 * MemoCache.ENTRY_OVERHEAD)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") == 1  # a becomes most recently used
+    cache.set("d", 4)  # evicts b
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.get("d") == 4
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= stats["max_bytes"]
+
+
+def test_oversized_value_is_not_stored_and_clear_resets():
+    cache = MemoCache(max_bytes=200)
+    cache.set("big", "x", size=1000)
+    assert cache.get("big") is None
+    cache.set("k", 0)
+    assert cache.get("k", "missing") == 0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 0
+
+
+def test_ttl_expires_entries():
+    now = {"t": 0.0}
+    cache = MemoCache(max_bytes=1000, ttl=10, clock=lambda: now["t"])
+    cache.set("k", "v", size=1)
+    now["t"] = 9.9
+    assert cache.get("k") == "v"
+    now["t"] = 10.0
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["entries"] == 0 and stats["bytes"] == 0
+
+
+def test_oversized_replacement_drops_previous_value():
+    cache = MemoCache(max_bytes=MemoCache.ENTRY_OVERHEAD + 10)
+    cache.set("k", "old", size=5)
+    cache.set("k", "huge", size=1000)
+
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
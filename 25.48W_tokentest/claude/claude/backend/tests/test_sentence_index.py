@@ -0,0 +1,46 @@
+from app.core.sentence_index import SentenceTokenIndex, split_sentences
+
+
+def _words(text):
+    return len(text.split())
+
+
+def test_split_sentences_on_punctuation_and_newlines():
+    text = "첫 문장입니다. 두 번째 문장!\n세 번째"
+    assert split_sentences(text) == ["첫 문장입니다.", "두 번째 문장!", "세 번째"]
+    assert split_sentences("") == []
+    assert split_sentences("   ") == []
+
+
+def test_counts_each_sentence_once_and_builds_prefix_sums():
+    calls = []
+
+    def counter_fn(t):
+        calls.append(t)
+        return _words(t)
+
+    index = SentenceTokenIndex("a b. c d e. f", counter_fn=counter_fn)
+    assert index.counts == [2, 3, 1]
+    assert index.prefix_sums == [0, 2, 5, 6]
+    assert index.total_tokens == 6
+
+    # selection never re-encodes
+    index.prefix(4)
+    index.suffix(4)
+    assert len(calls) == 3
+
+
+def test_prefix_and_suffix_pick_longest_run_under_budget():
+    index = SentenceTokenIndex("a b. c d e. f", counter_fn=_words)
+    assert index.prefix(5).text == "a b. c d e."
+    assert index.prefix(4).text == "a b."
+    assert index.suffix(4).text == "c d e. f"
+    assert index.suffix(3).text == "f"
+    assert index.select("vector", 100).text == "a b. c d e. f"
+
+
+def test_keeps_one_sentence_when_budget_too_small():
+    index = SentenceTokenIndex("a b c. d e f", counter_fn=_words)
+    assert index.prefix(1).text == "a b c."
+    assert index.suffix(1).text == "d e f"
+    assert SentenceTokenIndex("", counter_fn=_words).prefix(10).text == ""
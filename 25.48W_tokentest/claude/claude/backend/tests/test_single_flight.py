@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+from app.services.providers.gpt5_provider import summary_request_key
+
+
+def test_concurrent_duplicates_share_one_call():
+    flights = SingleFlight()
+    calls = []
+
+    async def upstream(tag):
+        calls.append(tag)
+        await asyncio.sleep(0.01)
+        return f"summary-{tag}"
+
+    async def run():
+        return await asyncio.gather(
+            flights.do("k1", lambda: upstream("a")),
+            flights.do("k1", lambda: upstream("b")),
+            flights.do("k2", lambda: upstream("c")),
+        )
+
+    assert asyncio.run(run()) == ["summary-a", "summary-a", "summary-c"]
+    assert calls == ["a", "c"]
+    assert flights.stats()["leaders"] == 2 and flights.stats()["shared"] == 1
+    assert len(flights) == 0
+
+
+def test_errors_are_shared_and_key_is_released():
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    async def run():
+        results = await asyncio.gather(
+            flights.do("k", failing), flights.do("k", failing), return_exceptions=True
+        )
+        again = await flights.do("k", lambda: asyncio.sleep(0, result="ok"))
+        return results, again
+
+    results, again = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert again == "ok"
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flights = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.create_task(flights.do("k", upstream))
+        second = asyncio.create_task(flights.do("k", upstream))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_summary_request_key_covers_all_inputs():
+    base = summary_request_key("m", "inst", "text", b"img")
+    assert base == summary_request_key("m", "inst", "text", b"img")
+    assert base != summary_request_key("m2", "inst", "text", b"img")
+    assert base != summary_request_key("m", "inst2", "text", b"img")
+    assert base != summary_request_key("m", "inst", "text2", b"img")
+    assert base != summary_request_key("m", "inst", "text", b"img2")
+    assert summary_request_key("m", "i", None, None) == summary_request_key("m", "i", "", b"")
@@ -1,5 +1,6 @@
 import pytest
 from app.core.summarizer import summarize_with_steps, make_shorten_fn
+from app.eval.metrics_v04 import token_count_tiktoken
 
 
 def test_steps_single_when_under_limit():
@@ -58,3 +59,24 @@ def test_steps_three_when_two_shorten_needed():
     assert steps[0]["summary"] == "orig"
     assert steps[1]["summary"] == "mid shorten"
     assert steps[2]["summary"] == "final shorten"
+
+
+def test_steps_two_with_limit_aware_shorten_fn():
+    fn = make_shorten_fn("lexical_v1", "lexical")
+    text = "one two. three four. five six seven"
+
+    limit = token_count_tiktoken("one two.") + token_count_tiktoken("three four.")
+
+    summary, steps = summarize_with_steps(text, limit=limit, shorten_fn=fn, counter_fn=token_count_tiktoken)
+    assert len(steps) == 2
+    assert summary == "one two. three four."
+    assert steps[-1] == {"summary": summary, "tokens": token_count_tiktoken(summary)}
+
+
+def test_limit_aware_pass_uses_caller_counter_units():
+    fn = make_shorten_fn("lexical_v1", "lexical")
+    text = " ".join(f"문장{i} 가나다 라마바 사아자." for i in range(50))
+    summary, steps = summarize_with_steps(text, limit=128, shorten_fn=fn)
+    # limit은 counter_fn(공백 단어) 단위: 4단어 문장 32개 = 128
+    assert len(summary.split()) == 128
+    assert steps[-1]["tokens"] == 128
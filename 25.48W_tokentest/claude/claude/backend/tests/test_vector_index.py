@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from app.services.vector_index import VectorIndex
+
+
+def _random_index(n=500, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vecs = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"d{i}" for i in range(n)]
+    return VectorIndex.build(ids, vecs), ids, vecs
+
+
+def test_matrix_is_contiguous_normalized_float32():
+    index, _, _ = _random_index()
+    assert index.matrix.dtype == np.float32
+    assert index.matrix.flags["C_CONTIGUOUS"]
+    assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1.0, atol=1e-5)
+
+
+def test_search_matches_brute_force_cosine():
+    index, ids, vecs = _random_index()
+    q = vecs[7] + 0.1
+    normed = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    expected = np.argsort(-(normed @ (q / np.linalg.norm(q))))[:5]
+
+    results = index.search(q, top_k=5)
+    assert [r["id"] for r in results] == [ids[i] for i in expected]
+    assert results[0]["score"] >= results[-1]["score"]
+
+
+def test_top_k_larger_than_index_and_zero_query():
+    index = VectorIndex.build(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    assert [r["id"] for r in index.search([1.0, 0.1], top_k=10)] == ["a", "b"]
+    assert all(r["score"] == 0.0 for r in index.search([0.0, 0.0], top_k=2))
+
+
+def test_dim_mismatch_raises():
+    index = VectorIndex.build(["a"], [[1.0, 0.0]])
+    with pytest.raises(ValueError):
+        index.search([1.0, 0.0, 0.0])
+
+
+def test_add_bumps_version_and_resets_ivf():
+    index, _, _ = _random_index(n=50)
+    index.train_ivf(4)
+    v = index.version
+    index.add(["new"], [np.ones(16)])
+    assert index.version > v
+    assert not index.is_ivf
+    assert index.search(np.ones(16), top_k=1)[0]["id"] == "new"
+
+
+def test_ivf_recall_and_full_probe_is_exact():
+    index, _, vecs = _random_index(n=1000)
+    queries = vecs[:20] + 0.05
+    exact = [[r["id"] for r in index.search(q, top_k=10)] for q in queries]
+
+    index.train_ivf(16, seed=1)
+    full = [[r["id"] for r in index.search(q, top_k=10, nprobe=16)] for q in queries]
+    assert full == exact
+
+    hits = 0
+    for q, truth in zip(queries, exact):
+        approx = {r["id"] for r in index.search(q, top_k=10, nprobe=4)}
+        hits += len(approx & set(truth))
+    assert hits / (10 * len(queries)) > 0.5
+
+
+def test_search_batch_matches_single_queries():
+    index, _, vecs = _random_index(n=200)
+    queries = vecs[:3]
+    batch = index.search_batch(queries, top_k=4)
+    for got, q in zip(batch, queries):
+        single = index.search(q, top_k=4)
+        assert [r["id"] for r in got] == [r["id"] for r in single]
+        assert [r["score"] for r in got] == pytest.approx([r["score"] for r in single], abs=1e-5)
+
+
+def test_nprobe_is_validated_and_clamped():
+    index, _, vecs = _random_index(n=200)
+    exact = index.search(vecs[0], top_k=5)
+    index.train_ivf(8)
+
+    for bad in (0, -1):
+        with pytest.raises(ValueError):
+            index.search(vecs[0], top_k=5, nprobe=bad)
+    assert index.search(vecs[0], top_k=5, nprobe=1000) == exact